@@ -0,0 +1,62 @@
+import sys
+import json
+import time
+import argparse
+import statistics
+import subprocess
+import importlib
+
+# Runs in a fresh interpreter for every measurement, so that nothing is imported yet.
+_MEASURE = '''
+import sys, json, time, importlib
+start = time.perf_counter()
+import core.app
+imported = time.perf_counter()
+module = importlib.import_module(sys.argv[1])
+view = getattr(module, sys.argv[2])()
+app = core.app.App(view, warm_up_shaders=False)
+if sys.argv[3] == 'window':
+    app.call_later(0, lambda: core.app.glfw.set_window_should_close(app.glfw_window, True))
+    app.execute()
+else:
+    app.start_headless()
+    app.run_frame()
+first_frame = time.perf_counter()
+print(json.dumps({
+    'import_ms': (imported - start) * 1000,
+    'first_frame_ms': (first_frame - start) * 1000,
+    'gl_loaded': 'OpenGL' in sys.modules,
+    'modules': len(sys.modules),
+}))
+'''
+
+
+def measure_startup(module_name: str, view_name: str, window: bool) -> dict:
+    output = subprocess.run(
+        [sys.executable, '-c', _MEASURE, module_name, view_name, 'window' if window else 'headless'],
+        check=True,
+        capture_output=True,
+        text=True,
+    ).stdout
+    return json.loads(output.splitlines()[-1])
+
+
+def run_benchmark(module_name: str, view_name: str, runs: int, window: bool):
+    importlib.import_module(module_name)  # Fails early on a wrong module name.
+    results = [measure_startup(module_name, view_name, window) for _ in range(runs)]
+    for key in ('import_ms', 'first_frame_ms'):
+        values = [result[key] for result in results]
+        print(f'{key}: median {statistics.median(values):.1f}, min {min(values):.1f}, max {max(values):.1f}')
+    print(f'modules loaded: {results[-1]["modules"]}, OpenGL loaded: {results[-1]["gl_loaded"]}')
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Skooter startup benchmark')
+    parser.add_argument('module')
+    parser.add_argument('view')
+    parser.add_argument('--runs', type=int, default=5)
+    parser.add_argument('--window', action='store_true', help='measure the first frame presented to a window')
+    arguments: argparse.Namespace = parser.parse_args()
+    start_time = time.perf_counter()
+    run_benchmark(arguments.module, arguments.view, arguments.runs, arguments.window)
+    print(f'Done in {time.perf_counter() - start_time:.1f}s')
@@ -0,0 +1,235 @@
+import time
+import weakref
+from typing import Callable, Dict, Optional, Any
+
+from .color import Color
+from .frame_scheduler import FrameScheduler
+
+# Seconds simulated per spring integration step, independent of the frame rate.
+SPRING_STEP = 1 / 240
+
+
+def linear(t: float) -> float:
+    return t
+
+
+def ease_in(t: float) -> float:
+    return t * t * t
+
+
+def ease_out(t: float) -> float:
+    return 1 - (1 - t) ** 3
+
+
+def ease_in_out(t: float) -> float:
+    return 4 * t * t * t if t < 0.5 else 1 - (-2 * t + 2) ** 3 / 2
+
+
+def interpolate(start, end, progress: float):
+    if isinstance(start, Color):
+        return start.lerp(end, progress)
+    return start + (end - start) * progress
+
+
+class AnimatedProperty:
+    """
+    How an animated value is read from a view and what has to be redone after it is set.
+    """
+    __slots__ = ('get', 'affects_layout', 'affects_content')
+
+    def __init__(self, get: Callable[[Any], Any] = None, affects_layout: bool = False,
+                 affects_content: bool = True):
+        self.get = get
+        self.affects_layout = affects_layout
+        self.affects_content = affects_content
+
+
+def _get_opacity(view) -> float:
+    return view._layer.opacity if view._layer is not None else 1
+
+
+PROPERTIES: Dict[str, AnimatedProperty] = {
+    # Only the cached layer is composited differently, its content stays.
+    'opacity': AnimatedProperty(_get_opacity, affects_content=False),
+    'x': AnimatedProperty(lambda view: view._x),
+    'y': AnimatedProperty(lambda view: view._y),
+    'width': AnimatedProperty(lambda view: view._width, affects_layout=True),
+    'height': AnimatedProperty(lambda view: view._height, affects_layout=True),
+    'color': AnimatedProperty(lambda view: view.current_color),
+    'background': AnimatedProperty(lambda view: view.current_background),
+}
+# Any other fluent setter may be animated, it is assumed to change the layout.
+DEFAULT_PROPERTY = AnimatedProperty(affects_layout=True)
+
+
+def apply_property(view, name: str, value):
+    """
+    Sets the value through the view's fluent setter and invalidates only what depends on it,
+    the body of the view is not rebuilt.
+    """
+    getattr(view, name)(value)
+    animated_property = PROPERTIES.get(name, DEFAULT_PROPERTY)
+    if animated_property.affects_layout:
+        view.invalidate_layout()
+    if animated_property.affects_content or view.parent is None:
+        view.request_repaint()
+    else:
+        view.parent.request_repaint()
+
+
+class Animation:
+    """
+    Value of a property going from start to end. Subclasses advance it in step(now), which returns
+    whether the animation finished.
+    """
+    __slots__ = ('name', 'start', 'end', 'value', 'on_done')
+
+    def __init__(self, name: str, start, end, on_done: Callable[[], None] = None):
+        self.name = name
+        self.start = start
+        self.end = end
+        self.value = start
+        self.on_done = on_done
+
+
+class Tween(Animation):
+    __slots__ = ('duration', 'easing', 'start_time')
+
+    def __init__(self, name: str, start, end, duration: float, easing: Callable[[float], float] = ease_in_out,
+                 on_done: Callable[[], None] = None):
+        super().__init__(name, start, end, on_done)
+        self.duration = duration
+        self.easing = easing
+        self.start_time = time.perf_counter()
+
+    def step(self, now: float) -> bool:
+        progress = min(1.0, (now - self.start_time) / self.duration) if self.duration > 0 else 1.0
+        self.value = interpolate(self.start, self.end, self.easing(progress))
+        return progress >= 1
+
+
+class Spring(Animation):
+    """
+    Damped spring pulling the progress from start to end towards 1, so it overshoots naturally
+    with a low damping.
+    """
+    __slots__ = ('stiffness', 'damping', 'mass', 'progress', 'velocity', 'time')
+
+    def __init__(self, name: str, start, end, stiffness: float = 170, damping: float = 26, mass: float = 1,
+                 velocity: float = 0, on_done: Callable[[], None] = None):
+        super().__init__(name, start, end, on_done)
+        self.stiffness = stiffness
+        self.damping = damping
+        self.mass = mass
+        self.progress = 0.0
+        self.velocity = velocity
+        self.time = time.perf_counter()
+
+    def value_velocity(self) -> Optional[float]:
+        """
+        Returns the velocity in units of the value, None for values that aren't numbers.
+        """
+        if isinstance(self.start, Color):
+            return None
+        return self.velocity * (self.end - self.start)
+
+    def step(self, now: float) -> bool:
+        while self.time + SPRING_STEP <= now:
+            force = self.stiffness * (1 - self.progress) - self.damping * self.velocity
+            self.velocity += force / self.mass * SPRING_STEP
+            self.progress += self.velocity * SPRING_STEP
+            self.time += SPRING_STEP
+
+        if abs(1 - self.progress) < 1e-3 and abs(self.velocity) < 1e-3:
+            self.value = self.end
+            return True
+        self.value = interpolate(self.start, self.end, self.progress)
+        return False
+
+
+class Animator:
+    """
+    Runs the animations of all views from animation frames of the scheduler. Frames are only
+    requested while some animation is running, so an idle app sleeps until the next event.
+
+    A property has at most one animation, starting another one continues from the current value.
+    """
+
+    def __init__(self, scheduler: FrameScheduler):
+        self.__scheduler = scheduler
+        self.__animations: 'weakref.WeakKeyDictionary[Any, Dict[str, Animation]]' = weakref.WeakKeyDictionary()
+        self.__frame_requested = False
+
+    @property
+    def active(self) -> bool:
+        return bool(self.__animations)
+
+    def tween(self, view, name: str, end, duration: float = 0.3, easing: Callable[[float], float] = ease_in_out,
+              start=None, on_done: Callable[[], None] = None) -> Tween:
+        start = self.__get_start_value(view, name, start)
+        return self.__add(view, Tween(name, start, end, duration, easing, on_done))
+
+    def spring(self, view, name: str, end, stiffness: float = 170, damping: float = 26, mass: float = 1,
+               start=None, on_done: Callable[[], None] = None) -> Spring:
+        running = self.__animations.get(view, {}).get(name)
+        start = self.__get_start_value(view, name, start)
+        velocity = 0
+        # A spring that is retargeted keeps its momentum.
+        if isinstance(running, Spring) and not isinstance(start, Color) and end != start:
+            value_velocity = running.value_velocity()
+            if value_velocity is not None:
+                velocity = value_velocity / (end - start)
+        return self.__add(view, Spring(name, start, end, stiffness, damping, mass, velocity, on_done))
+
+    def stop(self, view, name: str = None):
+        """
+        Stops animations of the view where they are, all of them when no name is given.
+        """
+        animations = self.__animations.get(view)
+        if animations is None:
+            return
+        if name is None:
+            animations.clear()
+        else:
+            animations.pop(name, None)
+        if not animations:
+            del self.__animations[view]
+
+    def __get_start_value(self, view, name: str, start):
+        if start is not None:
+            return start
+        running = self.__animations.get(view, {}).get(name)
+        if running is not None:
+            return running.value
+        getter = PROPERTIES.get(name, DEFAULT_PROPERTY).get
+        start = getter(view) if getter is not None else None
+        if start is None:
+            raise ValueError(f'The current value of "{name}" is unknown, pass the start value of the animation.')
+        return start
+
+    def __add(self, view, animation: Animation) -> Animation:
+        self.__animations.setdefault(view, {})[animation.name] = animation
+        if not self.__frame_requested:
+            self.__frame_requested = True
+            self.__scheduler.request_animation_frame(self.__step)
+        return animation
+
+    def __step(self, now: float):
+        self.__frame_requested = False
+        finished_callbacks = []
+        for view, animations in list(self.__animations.items()):
+            for name, animation in list(animations.items()):
+                finished = animation.step(now)
+                apply_property(view, name, animation.value)
+                if finished:
+                    del animations[name]
+                    if animation.on_done is not None:
+                        finished_callbacks.append(animation.on_done)
+            if not animations:
+                del self.__animations[view]
+
+        for callback in finished_callbacks:
+            callback()
+        if self.__animations and not self.__frame_requested:
+            self.__frame_requested = True
+            self.__scheduler.request_animation_frame(self.__step)
@@ -1,61 +1,261 @@
 import time
 import gc
-from typing import Optional
+import datetime
+import threading
+from concurrent.futures import Future
+from typing import Optional, Tuple, Callable, Dict, Awaitable
 
-import glfw
 import skia
-from OpenGL import GL
 
 from .singleton import Singleton
 from .key_input import KeyInput
-from .base import View, HOVER_STACK
+from .base import View, HOVER_STACK, REDRAW_REQUEST
+from .data import transfer_state
+from .frame_stats import FrameStats
+from .frame_scheduler import FrameScheduler, Timer
+from .animation import Animator
+from .memory import ClassMemory, measure_tree
+from .ui_thread import UI_THREAD
+from .async_loop import ASYNC_LOOP
+from .render_pipeline import RenderPipeline, Frame
+from .display_list import DisplayList, RecordingCanvas
+from .input_trace import InputRecorder, CURSOR_POS, MOUSE_BUTTON, KEY, CHAR, RESIZE
+from .shaders import warm_up
+
+
+# GLFW and OpenGL are only imported once a window is created, headless apps never load them.
+glfw = None
+GL = None
+
+
+def import_gl():
+    global glfw, GL
+    if glfw is None:
+        import glfw as glfw_module
+        from OpenGL import GL as gl_module
+        glfw, GL = glfw_module, gl_module
 
 
 def get_hovered_view(x: float, y: float) -> Optional[View]:
-    for hover_item in HOVER_STACK:
-        x_overlaps = hover_item['min_x'] <= x <= hover_item['max_x']
-        y_overlaps = hover_item['min_y'] <= y <= hover_item['max_y']
-        view = hover_item['view']
-        if x_overlaps and y_overlaps and view.private.handles_hover:
+    # Views drawn last are on top, so the stack is searched from its end.
+    for view, min_x, min_y, max_x, max_y in reversed(HOVER_STACK):
+        if min_x <= x <= max_x and min_y <= y <= max_y and view.private.handles_hover:
             return view
     return None
 
 
 class App(metaclass=Singleton):
-    def __init__(self, root_view: View, window_width=640, window_height=480, window_title='Window'):
+    def __init__(
+            self,
+            root_view: View,
+            window_width=640,
+            window_height=480,
+            window_title='Window',
+            pipelined: bool = False,
+            swap_interval: int = 1,
+            target_fps: Optional[float] = 60,
+            gpu_cache_limit: Optional[int] = None,
+            gpu_idle_cleanup: Optional[float] = 5,
+            warm_up_shaders: bool = True,
+            input_trace: Optional[str] = None,
+    ):
+        """
+        gpu_cache_limit is the budget of the GPU resource cache in bytes, Skia's default is used
+        when it is None. After gpu_idle_cleanup seconds without presenting a frame, GPU resources
+        not used since are freed.
+
+        With warm_up_shaders, the window is shown after the shaders of all primitives are compiled.
+
+        Input events are recorded to the input_trace file, see core.input_trace.
+        """
+        self.glfw_window = None
         self.key_input = KeyInput()
-        self.root_view: View = root_view.context(self.key_input)
+        self.scheduler = FrameScheduler(target_fps, wake=self.__wake)
+        self.animator = Animator(self.scheduler)
+        self.root_view: View = root_view.context(self.key_input).context(self.animator)
         self.window_width = window_width
         self.window_height = window_height
         self.window_title = window_title
-        self.glfw_window = None
         self.surface = None
         self.context = None
         self.hovered_view: Optional[View] = None
         self.pressed_view: Optional[View] = None
+        self.__pending_root_view = None
+        self.__pending_root_view_lock = threading.Lock()
+        self.swap_interval = swap_interval
+        self.gpu_cache_limit = gpu_cache_limit
+        self.gpu_idle_cleanup = gpu_idle_cleanup
+        self.warm_up_shaders = warm_up_shaders
+        self.input_trace = input_trace
+        self.__input_recorder: Optional[InputRecorder] = None
+        self.__last_present_time = time.perf_counter()
+        self.__gpu_resources_purged = False
+        self.frame_stats = FrameStats()
+        self.__scheduled_work_pending = False
+        self.__pending_input_times = []
+        self.__cursor_pos: Tuple[float, float] = (-1, -1)
+        self.__cursor_moved = False
+        self.__pipeline: Optional[RenderPipeline] = None
+        if pipelined:
+            self.__pipeline = RenderPipeline(self.__record_frame, self.__wake)
+        self.__last_frame: Optional[Frame] = None
+        self.__display_list: Optional[DisplayList] = None
+        self.__recorded_size: Optional[Tuple[int, int]] = None
+        self.__pending_size: Optional[Tuple[int, int]] = None
+        self.__framebuffer_size: Optional[Tuple[int, int]] = None
 
-    def draw(self):
-        HOVER_STACK.clear()
-        GL.glClear(GL.GL_COLOR_BUFFER_BIT)
-        with self.surface as canvas:
-            start_time = time.time()
-            self.root_view.draw(canvas, 0, 0, self.window_width, self.window_height)
-            # print('Draw time:', round((time.time() - start_time) * 1000, 5), 'ms')
-            canvas.flush()
+    def __wake(self):
+        if self.glfw_window is not None:
+            glfw.post_empty_event()
 
-        gc.collect()
-        self.context.flush()
-        glfw.swap_buffers(self.glfw_window)
+    def call_later(self, delay: float, callback: Callable[[], None]) -> Timer:
+        return self.scheduler.call_later(delay, callback)
 
-        mouse_x, mouse_y, = glfw.get_cursor_pos(self.glfw_window)
-        self.__update_hovered_view(mouse_x, mouse_y)
+    def request_animation_frame(self, callback: Callable[[float], None]):
+        self.scheduler.request_animation_frame(callback)
 
-    def __update_hovered_view(self, mouse_x: int, mouse_y: int):
-        if not (0 < mouse_x < self.window_width and 0 < mouse_y < self.window_height):
-            self.hovered_view = None
+    def post(self, task: Callable[[], None]):
+        """
+        Runs task on the UI thread before the next frame is recorded, waking the event loop. Safe
+        to call from any thread, it is how background threads should change views and State.
+        """
+        UI_THREAD.post(task)
+
+    def __drain_posted_tasks(self):
+        queue_depth = len(UI_THREAD)
+        if not queue_depth:
+            return
+        start_time = time.perf_counter()
+        UI_THREAD.drain()
+        self.frame_stats.record_drain(queue_depth, time.perf_counter() - start_time)
+
+    def run_async(self, coroutine: Awaitable) -> Future:
+        """
+        Runs the coroutine on the app's asyncio loop, which runs in a background thread. State it
+        writes is applied on the UI thread at the next frame.
+        """
+        return ASYNC_LOOP.run(coroutine)
+
+    def replace_root_view(self, view: View, keep_state: bool = False):
+        """
+        Schedules the root view to be replaced before the next frame. Safe to call from any thread.
+        """
+        with self.__pending_root_view_lock:
+            self.__pending_root_view = (view, keep_state)
+        if self.__pipeline is not None:
+            self.__pipeline.request_frame()
+        else:
+            self.__wake()
+
+    def __apply_pending_root_view(self):
+        with self.__pending_root_view_lock:
+            pending = self.__pending_root_view
+            self.__pending_root_view = None
+        if pending is None:
             return
 
-        hovered_view = get_hovered_view(mouse_x, mouse_y)
+        view, keep_state = pending
+        if keep_state:
+            transfer_state(self.root_view, view)
+        self.root_view = view.context(self.key_input).context(self.animator)
+        self.hovered_view = None
+        self.pressed_view = None
+        REDRAW_REQUEST.set()
+
+    def draw(self, force: bool = False) -> bool:
+        """
+        Records a frame and presents it if it changed, returns whether it was presented.
+        """
+        display_list = self.__record_frame(force)
+        if display_list is not None:
+            self.__present(Frame(display_list, self.__pending_input_times))
+        self.__pending_input_times = []
+        return display_list is not None
+
+    def run_frame(self) -> bool:
+        """
+        Runs due timers and pending input, then draws. Returns whether a frame was presented.
+        """
+        self.scheduler.run_due(time.perf_counter())
+        self.__apply_pending_size()
+        self.__process_cursor_move()
+        return self.draw()
+
+    def __record_frame(self, force: bool = False) -> Optional[DisplayList]:
+        """
+        Rebuilds and records the view tree. Runs on the UI-logic thread in pipelined mode.
+
+        Returns None when the recorded frame would be identical to the previous one.
+        """
+        self.__drain_posted_tasks()
+        self.__apply_pending_root_view()
+        size = (self.window_width, self.window_height)
+        if not force and not REDRAW_REQUEST.is_set() and size == self.__recorded_size:
+            return None
+
+        REDRAW_REQUEST.clear()
+        HOVER_STACK.clear()
+        start_time = time.time()
+        canvas = RecordingCanvas(*size)
+        self.root_view.draw(canvas, 0, 0, *size)
+        display_list = canvas.finish()
+        self.frame_stats.record_culled(canvas.culled_views)
+        # print('Draw time:', round((time.time() - start_time) * 1000, 5), 'ms')
+        gc.collect()
+
+        unchanged = size == self.__recorded_size and display_list == self.__display_list
+        self.__display_list = display_list
+        self.__recorded_size = size
+        # Layout might have moved views under a still cursor.
+        self.__update_hovered_view(*self.__cursor_pos)
+        if self.__pipeline is not None and REDRAW_REQUEST.is_set():
+            self.__pipeline.request_frame()
+        if unchanged and not force:
+            return None
+        return display_list
+
+    def __present(self, frame: Frame):
+        """
+        Submits a recorded frame to the GPU. Runs on the render thread in pipelined mode.
+        """
+        if self.glfw_window is None:
+            # Headless, the surface is rasterized on the CPU.
+            with self.surface as canvas:
+                canvas.clear(skia.ColorWHITE)
+                frame.display_list.replay(canvas)
+            self.surface.flushAndSubmit()
+        else:
+            GL.glClear(GL.GL_COLOR_BUFFER_BIT)
+            with self.surface as canvas:
+                frame.display_list.replay(canvas)
+                canvas.flush()
+
+            self.context.flush()
+            glfw.swap_buffers(self.glfw_window)
+        present_time = time.perf_counter()
+        self.__last_present_time = present_time
+        self.__gpu_resources_purged = False
+        self.frame_stats.record_present(present_time, frame.input_times)
+        self.scheduler.frame_presented(present_time, self.frame_stats)
+        frame.input_times = []
+        self.__last_frame = frame
+
+    def __dispatch_input(self, handler, *args):
+        timestamp = time.perf_counter()
+        if self.__pipeline is not None:
+            self.__pipeline.submit(lambda: handler(*args), timestamp)
+        else:
+            handler(*args)
+            self.__pending_input_times.append(timestamp)
+
+    def __update_hovered_view(self, mouse_x: int, mouse_y: int):
+        """
+        Hit-tests against the hover stack of the last recorded frame. Only calls hover handlers, which
+        request a redraw by changing State, when the hovered view changes.
+        """
+        hovered_view = None
+        if 0 < mouse_x < self.window_width and 0 < mouse_y < self.window_height:
+            hovered_view = get_hovered_view(mouse_x, mouse_y)
         if self.hovered_view == hovered_view:
             return
 
@@ -66,14 +266,65 @@ class App(metaclass=Singleton):
         if hovered_view is not None:
             hovered_view.private.handle_hover(over=True)
 
+    def __record_input(self, kind: int, *args):
+        if self.__input_recorder is not None:
+            self.__input_recorder.record(kind, *args)
+
+    # Input entry points, called by GLFW callbacks or by core.input_trace when replaying.
+
+    def handle_cursor_pos(self, x: float, y: float):
+        self.__record_input(CURSOR_POS, x, y)
+        self.__mouse_pos_callback(self.glfw_window, x, y)
+
+    def handle_mouse_button(self, button: int, action: int, mods: int):
+        self.__record_input(MOUSE_BUTTON, button, action, mods)
+        self.__dispatch_input(self.__mouse_button_callback, self.glfw_window, button, action, mods)
+
+    def handle_key(self, key: int, scancode: int, action: int, mods: int):
+        self.__record_input(KEY, key, scancode, action, mods)
+        self.__dispatch_input(self.key_input.key_callback, self.glfw_window, key, scancode, action, mods)
+
+    def handle_char(self, codepoint: int):
+        self.__record_input(CHAR, codepoint)
+        self.__dispatch_input(self.key_input.char_callback, self.glfw_window, codepoint)
+
+    def handle_resize(self, width: int, height: int):
+        self.__record_input(RESIZE, width, height)
+        self.window_size_callback(self.glfw_window, width, height)
+
     def __mouse_pos_callback(self, window, x: int, y: int):
-        self.__update_hovered_view(x, y)
+        # Cursor moves are coalesced: only the latest position is hit-tested, once per frame.
+        self.__cursor_pos = (x, y)
+        if self.__cursor_moved:
+            return
+        self.__cursor_moved = True
+        timestamp = time.perf_counter()
+        if self.__pipeline is not None:
+            self.__pipeline.submit(self.__process_cursor_move, timestamp)
+        else:
+            self.__pending_input_times.append(timestamp)
+
+    def __process_cursor_move(self):
+        if not self.__cursor_moved:
+            return
+        self.__cursor_moved = False
+        self.__update_hovered_view(*self.__cursor_pos)
+
+    def __focus_view_at(self, x: float, y: float):
+        for view, min_x, min_y, max_x, max_y in reversed(HOVER_STACK):
+            if min_x <= x <= max_x and min_y <= y <= max_y and self.key_input.is_focusable(view):
+                self.key_input.focus(view)
+                return
 
     def __mouse_button_callback(self, window, button, action, mods):
+        self.__process_cursor_move()
+        if button == 0 and action == 1:
+            self.__focus_view_at(*self.__cursor_pos)
         # Left click
         if button == 0 and action == 0 and self.hovered_view:
             self.hovered_view.private.handle_click()
-            self.pressed_view.private.handle_press(pressed=False)
+            if self.pressed_view is not None:
+                self.pressed_view.private.handle_press(pressed=False)
             self.pressed_view = None
         elif button == 0 and action == 1 and self.hovered_view:
             self.hovered_view.private.handle_press(pressed=True)
@@ -83,30 +334,62 @@ class App(metaclass=Singleton):
         if not glfw.init():
             raise RuntimeError('glfw.init() failed')
         glfw.window_hint(glfw.STENCIL_BITS, 8)
+        # Shown once shaders are warmed up.
+        glfw.window_hint(glfw.VISIBLE, not self.warm_up_shaders)
         self.glfw_window = glfw.create_window(self.window_width, self.window_height, self.window_title, None, None)
         glfw.make_context_current(self.glfw_window)
+        glfw.swap_interval(self.swap_interval)
 
     def window_size_callback(self, window, width, height):
-        # self.root_view.invalidate_cache(recursive=True)
-        self.window_width = width
-        self.window_height = height
-        # self.resize_hover_matrix() todo
-        self.create_skia_surface()
-        self.draw()
+        # A live resize sends many events between two frames, only the last size is applied.
+        self.__pending_size = (width, height)
+
+    def window_refresh_callback(self, window):
+        # Some platforms block the event loop while resizing and only call this callback.
+        if self.__apply_pending_size() and self.__pipeline is None:
+            self.draw()
+        elif self.__last_frame is not None:
+            self.__present(self.__last_frame)
+
+    def __apply_pending_size(self) -> bool:
+        """
+        Applies the last size the window was resized to, returns whether the size changed. The
+        surface is only recreated when the framebuffer size changes.
+        """
+        pending_size = self.__pending_size
+        self.__pending_size = None
+        if pending_size is None or pending_size == (self.window_width, self.window_height):
+            return False
+
+        self.window_width, self.window_height = pending_size
+        if self.glfw_window is None:
+            self.surface = skia.Surface(*pending_size)
+        elif self.__get_framebuffer_size() != self.__framebuffer_size:
+            self.create_skia_surface()
+        if self.__pipeline is not None:
+            self.__pipeline.request_frame()
+            # Keeps the window filled until the frame of the new size is recorded.
+            if self.__last_frame is not None:
+                self.__present(self.__last_frame)
+        return True
+
+    def __get_framebuffer_size(self) -> Tuple[int, int]:
+        width_scale, height_scale = glfw.get_window_content_scale(self.glfw_window)
+        return int(self.window_width * width_scale), int(self.window_height * height_scale)
 
     def create_skia_surface(self):
         if self.surface:
             del self.surface
 
-        width_scale, height_scale = glfw.get_window_content_scale(self.glfw_window)
+        framebuffer_width, framebuffer_height = self.__framebuffer_size = self.__get_framebuffer_size()
         backend_render_target = skia.GrBackendRenderTarget(
-            int(self.window_width * width_scale),
-            int(self.window_height * height_scale),
+            framebuffer_width,
+            framebuffer_height,
             0,  # sampleCnt
             0,  # stencilBits
             skia.GrGLFramebufferInfo(0, GL.GL_RGBA8),
         )
-        GL.glViewport(0, 0, int(self.window_width * width_scale), int(self.window_height * height_scale))
+        GL.glViewport(0, 0, framebuffer_width, framebuffer_height)
         self.surface = skia.Surface.MakeFromBackendRenderTarget(
             self.context,
             backend_render_target,
@@ -124,24 +407,135 @@ class App(metaclass=Singleton):
     #         column = [None] * self.window_width
     #         HOVER_MATRIX.append(column)
 
+    def create_gpu_context(self):
+        self.context = skia.GrDirectContext.MakeGL()
+        if self.gpu_cache_limit is not None:
+            self.context.setResourceCacheLimit(self.gpu_cache_limit)
+
+    def purge_gpu_resources(self, not_used_for: float = 0):
+        """
+        Frees GPU resources that were not used for the given number of seconds. Resources used by
+        the next frame are uploaded again.
+        """
+        self.context.purgeResourcesNotUsedInMs(datetime.timedelta(seconds=not_used_for))
+
+    def gpu_stats(self) -> dict:
+        """
+        Returns the bytes of GPU resources that could be freed, the budget of the resource cache
+        and the max texture size. The bindings do not expose the bytes in use.
+        """
+        if self.context is None:
+            return {}
+        return {
+            'purgeable_bytes': self.context.getResourceCachePurgeableBytes(),
+            'cache_limit': self.context.getResourceCacheLimit(),
+            'max_texture_size': self.context.maxTextureSize(),
+        }
+
+    def measure_memory(self) -> Dict[str, ClassMemory]:
+        """
+        Returns the number of views and bytes they take per view class in the current tree, see
+        core.memory.format_memory_report().
+        """
+        return measure_tree(self.root_view)
+
+    def __wait_idle(self):
+        """
+        Waits for events when nothing is scheduled, freeing unused GPU resources once the app has
+        been idle for gpu_idle_cleanup seconds.
+        """
+        if self.gpu_idle_cleanup is None or self.__gpu_resources_purged:
+            glfw.wait_events()
+            return
+
+        idle_time = time.perf_counter() - self.__last_present_time
+        if idle_time < self.gpu_idle_cleanup:
+            glfw.wait_events_timeout(self.gpu_idle_cleanup - idle_time)
+            return
+        self.purge_gpu_resources(not_used_for=self.gpu_idle_cleanup)
+        self.__gpu_resources_purged = True
+        glfw.wait_events()
+
+    def __wait_events(self, redraw_pending: bool):
+        timeout = self.scheduler.wait_timeout(time.perf_counter(), redraw_pending)
+        if timeout is None:
+            self.__wait_idle()
+        elif timeout > 0:
+            glfw.wait_events_timeout(timeout)
+        else:
+            glfw.poll_events()
+
+    def __run_scheduled_work(self):
+        self.__scheduled_work_pending = False
+        self.scheduler.run_due(time.perf_counter())
+
+    def start_headless(self, width: int = None, height: int = None):
+        """
+        Prepares the app to run without a window, rendering to a CPU surface. Input is fed through
+        the handle_* methods and frames are drawn with run_frame().
+        """
+        if self.__pipeline is not None:
+            raise RuntimeError('Headless apps can not be pipelined.')
+        self.window_width = width or self.window_width
+        self.window_height = height or self.window_height
+        self.surface = skia.Surface(self.window_width, self.window_height)
+        UI_THREAD.attach(wake=lambda: None)
+
+    def __execute_sequential(self):
+        UI_THREAD.attach(wake=self.__wake)
+        while not glfw.window_should_close(self.glfw_window):
+            self.run_frame()
+            self.__wait_events(REDRAW_REQUEST.is_set())
+
+    def __execute_pipelined(self):
+        self.__pipeline.start()
+        self.__pipeline.submit(lambda: UI_THREAD.attach(wake=self.__pipeline.request_frame))
+        self.__pipeline.request_frame()
+        try:
+            while not glfw.window_should_close(self.glfw_window):
+                self.__apply_pending_size()
+                frame = self.__pipeline.take_frame()
+                if frame is not None:
+                    self.__present(frame)
+                # Timers and animations mutate State, so they run on the UI-logic thread.
+                if not self.__scheduled_work_pending and self.scheduler.has_due_work(time.perf_counter()):
+                    self.__scheduled_work_pending = True
+                    self.__pipeline.submit(self.__run_scheduled_work)
+                self.__wait_events(redraw_pending=False)
+        finally:
+            self.__pipeline.stop()
+
     def execute(self):
+        import_gl()
         try:
             # self.resize_hover_matrix()
             self.create_glfw_window()
-            self.context = skia.GrDirectContext.MakeGL()
+            self.create_gpu_context()
             self.create_skia_surface()
+            if self.warm_up_shaders:
+                warm_up(self.context)
+                glfw.show_window(self.glfw_window)
             GL.glClearColor(255, 255, 255, 255)
 
-            glfw.set_window_size_callback(self.glfw_window, self.window_size_callback)
-            glfw.set_cursor_pos_callback(self.glfw_window, self.__mouse_pos_callback)
-            glfw.set_mouse_button_callback(self.glfw_window, self.__mouse_button_callback)
-            glfw.set_key_callback(self.glfw_window, self.key_input.key_callback)
-            glfw.set_char_callback(self.glfw_window, self.key_input.char_callback)
+            if self.input_trace is not None:
+                self.__input_recorder = InputRecorder(self.input_trace, (self.window_width, self.window_height))
 
-            while not glfw.window_should_close(self.glfw_window):
-                self.draw()
-                glfw.wait_events()
+            glfw.set_window_size_callback(self.glfw_window, lambda window, *args: self.handle_resize(*args))
+            glfw.set_window_refresh_callback(self.glfw_window, self.window_refresh_callback)
+            glfw.set_cursor_pos_callback(self.glfw_window, lambda window, *args: self.handle_cursor_pos(*args))
+            glfw.set_mouse_button_callback(self.glfw_window, lambda window, *args: self.handle_mouse_button(*args))
+            glfw.set_key_callback(self.glfw_window, lambda window, *args: self.handle_key(*args))
+            glfw.set_char_callback(self.glfw_window, lambda window, *args: self.handle_char(*args))
+
+            if self.__pipeline is not None:
+                self.__execute_pipelined()
+            else:
+                self.__execute_sequential()
         finally:
+            UI_THREAD.detach()
+            ASYNC_LOOP.stop()
+            if self.__input_recorder is not None:
+                self.__input_recorder.close()
             if self.surface:
                 self.context.abandonContext()
             glfw.terminate()
@@ -0,0 +1,53 @@
+import asyncio
+import threading
+import traceback
+from concurrent.futures import Future
+from typing import Awaitable, Optional
+
+
+class AsyncLoop:
+    """
+    asyncio event loop running in a background thread, started on first use.
+
+    Coroutines run off the UI thread, State they write is applied on the UI thread at the next
+    frame, see core.ui_thread.
+    """
+
+    def __init__(self):
+        self.__loop: Optional[asyncio.AbstractEventLoop] = None
+        self.__thread: Optional[threading.Thread] = None
+        self.__lock = threading.Lock()
+
+    @property
+    def loop(self) -> asyncio.AbstractEventLoop:
+        with self.__lock:
+            if self.__loop is None:
+                self.__loop = asyncio.new_event_loop()
+                self.__thread = threading.Thread(target=self.__loop.run_forever, name='asyncio', daemon=True)
+                self.__thread.start()
+        return self.__loop
+
+    def run(self, coroutine: Awaitable) -> Future:
+        future = asyncio.run_coroutine_threadsafe(coroutine, self.loop)
+        future.add_done_callback(_report_exception)
+        return future
+
+    def stop(self):
+        with self.__lock:
+            if self.__loop is None:
+                return
+            self.__loop.call_soon_threadsafe(self.__loop.stop)
+            self.__thread.join()
+            self.__loop.close()
+            self.__loop = None
+            self.__thread = None
+
+
+def _report_exception(future: Future):
+    if future.cancelled() or future.exception() is None:
+        return
+    exception = future.exception()
+    traceback.print_exception(type(exception), exception, exception.__traceback__)
+
+
+ASYNC_LOOP = AsyncLoop()
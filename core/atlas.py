@@ -0,0 +1,110 @@
+from typing import Dict, List, Optional, Hashable, Tuple
+
+import skia
+
+
+class Shelf:
+    __slots__ = ('y', 'height', 'x')
+
+    def __init__(self, y: int, height: int):
+        self.y = y
+        self.height = height
+        self.x = 0
+
+
+class AtlasPage:
+    """
+    One shared texture, filled left to right in shelves of rows.
+    """
+    __slots__ = ('size', 'surface', 'shelves', '__image')
+
+    def __init__(self, size: int):
+        self.size = size
+        self.surface = skia.Surface(size, size)
+        self.surface.getCanvas().clear(skia.ColorTRANSPARENT)
+        self.shelves: List[Shelf] = []
+        self.__image: Optional[skia.Image] = None
+
+    @property
+    def image(self) -> skia.Image:
+        if self.__image is None:
+            self.__image = self.surface.makeImageSnapshot()
+        return self.__image
+
+    def allocate(self, width: int, height: int) -> Optional[Tuple[int, int]]:
+        # Best fit: the lowest shelf tall enough that still has room.
+        best_shelf = None
+        for shelf in self.shelves:
+            if height <= shelf.height and shelf.x + width <= self.size:
+                if best_shelf is None or shelf.height < best_shelf.height:
+                    best_shelf = shelf
+
+        if best_shelf is None:
+            top = self.shelves[-1].y + self.shelves[-1].height if self.shelves else 0
+            if top + height > self.size or width > self.size:
+                return None
+            best_shelf = Shelf(top, height)
+            self.shelves.append(best_shelf)
+
+        position = (best_shelf.x, best_shelf.y)
+        best_shelf.x += width
+        return position
+
+    def add(self, image: skia.Image, x: int, y: int):
+        self.surface.getCanvas().drawImage(image, x, y)
+        self.__image = None
+
+
+class AtlasEntry:
+    __slots__ = ('page', 'src')
+
+    def __init__(self, page: AtlasPage, src: skia.Rect):
+        self.page = page
+        self.src = src
+
+
+class ImageAtlas:
+    """
+    Packs small images into shared pages, so that drawing many icons samples a handful of
+    textures. Draws of consecutive entries of one page are merged into a single drawAtlas call
+    when the display list is replayed.
+    """
+
+    def __init__(self, page_size: int = 1024, max_image_size: int = 128, padding: int = 1):
+        self.page_size = page_size
+        self.max_image_size = max_image_size
+        self.padding = padding
+        self.pages: List[AtlasPage] = []
+        self.__entries: Dict[Hashable, AtlasEntry] = {}
+
+    def accepts(self, width: float, height: float) -> bool:
+        return width <= self.max_image_size and height <= self.max_image_size
+
+    def get(self, key: Hashable) -> Optional[AtlasEntry]:
+        return self.__entries.get(key)
+
+    def add(self, key: Hashable, image: skia.Image) -> Optional[AtlasEntry]:
+        entry = self.__entries.get(key)
+        if entry is not None:
+            return entry
+        if not self.accepts(image.width(), image.height()):
+            return None
+
+        # Padding keeps filtering from sampling neighbouring images.
+        cell_width = image.width() + 2 * self.padding
+        cell_height = image.height() + 2 * self.padding
+        for page in self.pages:
+            position = page.allocate(cell_width, cell_height)
+            if position is not None:
+                break
+        else:
+            page = AtlasPage(self.page_size)
+            self.pages.append(page)
+            position = page.allocate(cell_width, cell_height)
+
+        x = position[0] + self.padding
+        y = position[1] + self.padding
+        page.add(image, x, y)
+        entry = AtlasEntry(page, skia.Rect.MakeXYWH(x, y, image.width(), image.height()))
+        self.__entries[key] = entry
+        return entry
@@ -1,12 +1,36 @@
+import asyncio
 import dataclasses
-from typing import Optional, List, Dict, Callable
+import threading
+from typing import Optional, List, Dict, Callable, Sequence, Tuple, Union
 
 import skia
 
-from core.data import DataBinding, Binding
+from core.animation import Animator, ease_in_out
+from core.async_loop import ASYNC_LOOP
+from core.color import Color
+from core.data import DataBinding, Binding, ContextProperty
+from core.display_list import RecordingCanvas, LayerContent
+from core.style import Style
 
 CONTAINER_STACK = []
 HOVER_STACK = []
+# Set whenever the view tree changes, the next frame is only re-recorded if it is set.
+REDRAW_REQUEST = threading.Event()
+
+
+def clip_hover_stack(start: int, min_x: float, min_y: float, max_x: float, max_y: float):
+    """
+    Clips hover entries added since start to the given bounds, dropping the ones outside.
+    """
+    clipped = []
+    for view, view_min_x, view_min_y, view_max_x, view_max_y in HOVER_STACK[start:]:
+        view_min_x = max(view_min_x, min_x)
+        view_min_y = max(view_min_y, min_y)
+        view_max_x = min(view_max_x, max_x)
+        view_max_y = min(view_max_y, max_y)
+        if view_min_x < view_max_x and view_min_y < view_max_y:
+            clipped.append((view, view_min_x, view_min_y, view_max_x, view_max_y))
+    HOVER_STACK[start:] = clipped
 
 
 @dataclasses.dataclass
@@ -75,27 +99,59 @@ class Spacing:
         return self._left
 
 
+class Layer:
+    """
+    Compositing properties of a view. Layers with opacity are rendered once into an image which is
+    reused until something in the subtree changes.
+    """
+    __slots__ = ('opacity', 'clip', 'clip_hover', 'transform', 'content', 'hover_entries', 'size', 'dirty')
+
+    def __init__(self):
+        self.opacity: float = 1
+        self.clip: bool = False
+        self.clip_hover: bool = False
+        self.transform: Optional[skia.Matrix] = None
+        self.content: Optional[LayerContent] = None
+        self.hover_entries: list = []
+        self.size = None
+        self.dirty = True
+
+
+# Shared by all views until they get children, margins or padding of their own.
+NO_CHILDREN = ()
+NO_SPACING = (0, 0, 0, 0)
+
+
 class ViewPrivate:
+    __slots__ = ('__view', )
+
     def __init__(self, view: 'View'):
         self.__view = view
 
     def __get_private_property(self, name: str):
         return getattr(self.__view, f'_View__{name}')
 
+    @staticmethod
+    def __call_handler(handler, *args):
+        result = handler(*args)
+        # Async handlers run on the asyncio loop of the app.
+        if asyncio.iscoroutine(result):
+            ASYNC_LOOP.run(result)
+
     def handle_hover(self, over: bool):
         handler = self.__get_private_property('on_hover')
         if handler:
-            handler(over)
+            self.__call_handler(handler, over)
 
     def handle_click(self):
         handler = self.__get_private_property('on_click')
         if handler:
-            handler()
+            self.__call_handler(handler)
 
     def handle_press(self, pressed: bool):
         handler = self.__get_private_property('on_press')
         if handler:
-            handler(pressed)
+            self.__call_handler(handler, pressed)
 
     @property
     def handles_hover(self) -> bool:
@@ -108,14 +164,16 @@ class ViewPrivate:
 
 class View:
     __slots__ = (
-        'private', 'parent', '_children', '_x', '_y', '_width', '_height', '_top_margin',
-        '_right_margin', '_bottom_margin', '_left_margin', '_top_padding', '_right_padding',
-        '_bottom_padding', '_left_padding', '__context_properties', '__weakref__', '__on_hover',
-        '__on_click', '__body', '__on_press',
+        '__private', 'parent', '_children', '_x', '_y', '_width', '_height', '_margin', '_padding',
+        '__context_properties', '__weakref__', '__on_hover', '__on_click', '__body', '__on_press', '_layer',
     )
 
+    __animator: Animator = ContextProperty()
+
     def __init__(self, **props):
-        self.private = ViewPrivate(self)
+        # Rarely used fields stay None or shared until they are needed.
+        self.__private: Optional[ViewPrivate] = None
+        self._children: Sequence[View] = NO_CHILDREN
         self.parent: View = CONTAINER_STACK[-1] if CONTAINER_STACK else None
         if self.parent:
             self.parent.append_child(self)
@@ -123,27 +181,21 @@ class View:
         self.__fill_props(props)
         self.__check_required_props_filled(props)
 
-        self._children: List[View] = []
         self.__body: Optional[View] = None
         self._x: float = 0
         self._y: float = 0
         self._height: float = 0
         self._width: float = 0
 
-        self._top_margin: float = 0
-        self._right_margin: float = 0
-        self._bottom_margin: float = 0
-        self._left_margin: float = 0
-
-        self._top_padding: float = 0
-        self._right_padding: float = 0
-        self._bottom_padding: float = 0
-        self._left_padding: float = 0
+        # Spacings are (top, right, bottom, left).
+        self._margin: Tuple[float, float, float, float] = NO_SPACING
+        self._padding: Tuple[float, float, float, float] = NO_SPACING
 
-        self.__context_properties: Dict[type, object] = {}
+        self.__context_properties: Optional[Dict[type, object]] = None
         self.__on_hover: Optional[Callable[[bool], None]] = None
         self.__on_click: Optional[Callable[[], None]] = None
         self.__on_press: Optional[Callable[[], None]] = None
+        self._layer: Optional[Layer] = None
 
     def __enter__(self):
         CONTAINER_STACK.append(self)
@@ -152,10 +204,66 @@ class View:
     def __exit__(self, exc_type, exc_val, exc_tb):
         CONTAINER_STACK.pop()
 
+    @property
+    def private(self) -> ViewPrivate:
+        if self.__private is None:
+            self.__private = ViewPrivate(self)
+        return self.__private
+
+    @property
+    def current_color(self) -> Optional[Color]:
+        """
+        The color set with color(), None for views that don't have one.
+        """
+        return None
+
+    @property
+    def current_background(self) -> Optional[Color]:
+        """
+        The color set with background(), None for views that don't have one.
+        """
+        return None
+
+    @property
+    def _top_margin(self) -> float:
+        return self._margin[0]
+
+    @property
+    def _right_margin(self) -> float:
+        return self._margin[1]
+
+    @property
+    def _bottom_margin(self) -> float:
+        return self._margin[2]
+
+    @property
+    def _left_margin(self) -> float:
+        return self._margin[3]
+
+    @property
+    def _top_padding(self) -> float:
+        return self._padding[0]
+
+    @property
+    def _right_padding(self) -> float:
+        return self._padding[1]
+
+    @property
+    def _bottom_padding(self) -> float:
+        return self._padding[2]
+
+    @property
+    def _left_padding(self) -> float:
+        return self._padding[3]
+
     def get_context_property(self, property_type: type):
+        if self.__context_properties is None:
+            return None
         return self.__context_properties.get(property_type)
 
     def append_child(self, child):
+        if not self._children:
+            self._children = []
         self._children.append(child)
 
     def body(self) -> 'View':
@@ -193,7 +301,7 @@ class View:
     def __fetch_body(self):
         if self.__body:
             return
-        self._children = []
+        self._children = NO_CHILDREN
         with self:
             self.__body: Optional[View] = self.body()
         if self.__body is not None and not issubclass(type(self.__body), View):
@@ -203,30 +311,89 @@ class View:
     def __overrides_body(self) -> bool:
         return 'body' in self.__class__.__dict__
 
-    def draw(self, canvas: skia.Canvas, x: float, y: float, width: float, height: float):
+    def draw(self, canvas: Union[skia.Canvas, RecordingCanvas], x: float, y: float, width: float, height: float):
+        if canvas.quickReject(skia.Rect.MakeXYWH(x + self._x, y + self._y, width, height)):
+            # Only recording passes report culled views, views are drawn onto plain canvases too.
+            if isinstance(canvas, RecordingCanvas):
+                canvas.culled_views += 1
+            return
+        if self._layer is None:
+            self.__draw_content(canvas, x, y, width, height)
+        else:
+            self.__draw_layer(canvas, x, y, width, height)
+
+    def __draw_layer(self, canvas: RecordingCanvas, x: float, y: float, width: float, height: float):
+        layer = self._layer
+        canvas.save()
+        if layer.transform is not None:
+            canvas.translate(x, y)
+            canvas.concat(layer.transform)
+            canvas.translate(-x, -y)
+        if layer.clip:
+            clip_x, clip_y, clip_width, clip_height = self._get_clip_bounds(x, y, width, height)
+            canvas.clipRect(skia.Rect.MakeXYWH(clip_x, clip_y, clip_width, clip_height))
+
+        hover_start = len(HOVER_STACK)
+        if layer.opacity < 1:
+            if layer.dirty or layer.size != (width, height):
+                self.__record_layer(canvas, width, height)
+            canvas.drawLayer(layer.content, x, y, width, height, layer.opacity)
+            # Hit-testing ignores the layer's transform.
+            for view, min_x, min_y, max_x, max_y in layer.hover_entries:
+                HOVER_STACK.append((view, min_x + x, min_y + y, max_x + x, max_y + y))
+        else:
+            self.__draw_content(canvas, x, y, width, height)
+        if layer.clip and layer.clip_hover:
+            clip_hover_stack(hover_start, clip_x, clip_y, clip_x + clip_width, clip_y + clip_height)
+        canvas.restore()
+
+    def __record_layer(self, canvas: RecordingCanvas, width: float, height: float):
+        layer = self._layer
+        layer_canvas = RecordingCanvas(width, height)
+        hover_start = len(HOVER_STACK)
+        self.__draw_content(layer_canvas, 0, 0, width, height)
+        layer.hover_entries = HOVER_STACK[hover_start:]
+        del HOVER_STACK[hover_start:]
+        canvas.culled_views += layer_canvas.culled_views
+
+        display_list = layer_canvas.finish()
+        if layer.content is None or layer.content.display_list != display_list:
+            layer.content = LayerContent(display_list)
+        layer.size = (width, height)
+        layer.dirty = False
+
+    def _get_clip_bounds(self, x: float, y: float, width: float, height: float) -> Tuple[float, float, float, float]:
+        """
+        Returns the bounds clip() clips the view to, by default the space given by its parent.
+        """
+        return x, y, width, height
+
+    def __draw_content(self, canvas: Union[skia.Canvas, RecordingCanvas], x: float, y: float, width: float, height: float):
         self.__add_to_hover_stack(x, y, width, height)
         if self.__overrides_body:
             self.__fetch_body()
-            self.__body.draw(canvas, x + self._x, y + self._y, width, height)
+            # A body root created inside body() is one of the children, drawn below.
+            if self.__body.parent is not self:
+                self.__body.draw(canvas, x + self._x, y + self._y, width, height)
         else:
             self.paint(canvas, x + self._x, y + self._y, width, height)
 
         self.draw_children(canvas, x + self._x, y + self._y, width, height)
 
     def __add_to_hover_stack(self, x, y, width, height):
-        HOVER_STACK.insert(0, {
-            'view': self,
-            'min_x': x,
-            'min_y': y,
-            'max_x': x + width,
-            'max_y': y + height,
-        })
+        HOVER_STACK.append((self, x, y, x + width, y + height))
 
     def draw_children(self, canvas: skia.Surface, x: float, y: float, width: float, height: float):
         for view in self._children:
             view.draw(canvas, x, y, width, height)
 
-    def get_children(self) -> List['View']:
+    def constrain_width(self, width: float):
+        """
+        Called by containers with the width available to the view before it is measured.
+        """
+        pass
+
+    def get_children(self) -> Sequence['View']:
         return self._children
 
     def get_bounding_rect(self) -> Rect:
@@ -238,15 +405,42 @@ class View:
 
         return self.__body.get_bounding_rect()
 
+    def request_repaint(self):
+        """
+        Schedules a frame and drops cached layers of this view and its ancestors.
+        """
+        REDRAW_REQUEST.set()
+        view = self
+        while view is not None:
+            if view._layer is not None:
+                view._layer.dirty = True
+            view = view.parent
+
+    def invalidate_layout(self):
+        """
+        Drops cached layouts of this view and its ancestors, which depend on its size.
+        """
+        view = self
+        while view is not None:
+            view._clear_layout_cache()
+            view = view.parent
+
+    def _clear_layout_cache(self):
+        pass
+
     def invalidate_body(self):
+        self.request_repaint()
+        self.invalidate_layout()
         if not self.__overrides_body:
             return
         self.__body = None
-        self._children = []
+        self._children = NO_CHILDREN
 
     # Properties
 
     def context(self, value):
+        if self.__context_properties is None:
+            self.__context_properties = {}
         self.__context_properties[value.__class__] = value
         return self
 
@@ -284,10 +478,12 @@ class View:
             bottom=bottom,
             left=left,
         )
-        self._top_margin = top or self._top_margin
-        self._right_margin = right or self._right_margin
-        self._bottom_margin = bottom or self._bottom_margin
-        self._left_margin = left or self._left_margin
+        self._margin = (
+            top or self._top_margin,
+            right or self._right_margin,
+            bottom or self._bottom_margin,
+            left or self._left_margin,
+        )
         return self
 
     def padding(
@@ -308,10 +504,61 @@ class View:
             bottom=bottom,
             left=left,
         )
-        self._top_padding = top or self._top_padding
-        self._right_padding = right or self._right_padding
-        self._bottom_padding = bottom or self._bottom_padding
-        self._left_padding = left or self._left_padding
+        self._padding = (
+            top or self._top_padding,
+            right or self._right_padding,
+            bottom or self._bottom_padding,
+            left or self._left_padding,
+        )
+        return self
+
+    def style(self, style: Style):
+        """
+        Applies a style compiled with Style.compile() or taken from a StyleSheet.
+        """
+        style.apply(self)
+        return self
+
+    def __get_layer(self) -> Layer:
+        if self._layer is None:
+            self._layer = Layer()
+        return self._layer
+
+    def opacity(self, opacity: float):
+        self.__get_layer().opacity = opacity
+        return self
+
+    def clip(self, clip: bool = True, clip_hover: bool = False):
+        """
+        Clips drawing of the view and its subtree to its bounds. With clip_hover, parts of the
+        subtree outside of the bounds do not receive hover and click events either.
+        """
+        layer = self.__get_layer()
+        layer.clip = clip
+        layer.clip_hover = clip_hover
+        return self
+
+    def transform(self, matrix: Optional[skia.Matrix]):
+        self.__get_layer().transform = matrix
+        return self
+
+    def __get_animator(self) -> Animator:
+        if self.__animator is None:
+            raise RuntimeError('Only views shown by an App can be animated.')
+        return self.__animator
+
+    def animate(self, name: str, to, duration: float = 0.3, easing: Callable[[float], float] = ease_in_out,
+                start=None, on_done: Callable[[], None] = None):
+        """
+        Animates a property set by a fluent setter, such as opacity, x, y, width, height, color or
+        background, from its current value. The body is not rebuilt while it runs.
+        """
+        self.__get_animator().tween(self, name, to, duration, easing, start, on_done)
+        return self
+
+    def spring(self, name: str, to, stiffness: float = 170, damping: float = 26, start=None,
+               on_done: Callable[[], None] = None):
+        self.__get_animator().spring(self, name, to, stiffness, damping, start=start, on_done=on_done)
         return self
 
     def on_hover(self, handler: Callable[[bool], None]):
@@ -1,12 +1,26 @@
 import random
+import re
+from functools import lru_cache
+from typing import Tuple, Optional
 
 import skia
 
-from webcolors import hex_to_rgb
+_HEX_COLOR = re.compile(r'#([0-9a-fA-F]{3}|[0-9a-fA-F]{6})')
+
+
+@lru_cache(maxsize=1024)
+def hex_to_rgb(hex_code: str) -> Tuple[int, int, int]:
+    match = _HEX_COLOR.fullmatch(hex_code)
+    if match is None:
+        raise ValueError(f'"{hex_code}" is not a valid hex color.')
+    digits = match.group(1)
+    if len(digits) == 3:
+        digits = ''.join(digit * 2 for digit in digits)
+    return int(digits[0:2], 16), int(digits[2:4], 16), int(digits[4:6], 16)
 
 
 class Color:
-    __slots__ = ('__red', '__green', '__blue')
+    __slots__ = ('__red', '__green', '__blue', '__skia_color', '__paint')
 
     def __init__(self, *args):
         if len(args) == 1:
@@ -16,9 +30,39 @@ class Color:
             self.__red, self.__green, self.__blue = args
         else:
             raise RuntimeError('Unacceptable number of arguments given to Color()')
+        self.__skia_color: Optional[int] = None
+        self.__paint: Optional[skia.Paint] = None
+
+    @classmethod
+    @lru_cache(maxsize=1024)
+    def parse(cls, hex_code: str) -> 'Color':
+        """
+        Returns a shared color for the hex code, parsing it only once.
+        """
+        return cls(hex_code)
+
+    def lerp(self, other: 'Color', t: float) -> 'Color':
+        """
+        Returns the color t of the way from this color to the other one.
+        """
+        return Color(
+            max(0, min(255, round(self.__red + (other.__red - self.__red) * t))),
+            max(0, min(255, round(self.__green + (other.__green - self.__green) * t))),
+            max(0, min(255, round(self.__blue + (other.__blue - self.__blue) * t))),
+        )
 
     def as_skia_color(self) -> skia.Color:
-        return skia.Color(self.__red, self.__green, self.__blue)
+        if self.__skia_color is None:
+            self.__skia_color = skia.Color(self.__red, self.__green, self.__blue)
+        return self.__skia_color
+
+    def as_paint(self) -> skia.Paint:
+        """
+        Returns a fill paint of the color shared by all draws, callers must not modify it.
+        """
+        if self.__paint is None:
+            self.__paint = skia.Paint(Color=self.as_skia_color())
+        return self.__paint
 
     @classmethod
     def random(cls) -> 'Color':
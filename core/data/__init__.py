@@ -1,3 +1,3 @@
 from .context_property import ContextProperty
-from .state import State
+from .state import State, transfer_state
 from .binding import Binding, DataBinding
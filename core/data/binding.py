@@ -10,6 +10,21 @@ class DataBinding:
         self.__owner = weakref.ref(view)
         self.__property_name = property_name
 
+    @property
+    def owner(self):
+        return self.__owner()
+
+    @property
+    def property_name(self) -> str:
+        return self.__property_name
+
+    @property
+    def key(self) -> tuple:
+        """
+        Bindings to the same property of the same view have equal keys.
+        """
+        return self.__owner, self.__property_name
+
     def get(self):
         owner = self.__owner()
         if owner is None:
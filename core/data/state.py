@@ -1,20 +1,78 @@
+import threading
 import weakref
 
+from ..ui_thread import UI_THREAD
+
 
 class State:
+    """
+    A value owned by a view, writing it rebuilds the view's body.
+
+    Values written from other threads than the UI thread are applied at the next frame. Until
+    then only the writing thread reads them back, so `self.count += 1` adds up on a background
+    thread, but writes from several threads are not merged. To derive a value from one the UI
+    thread may change meanwhile, post the whole update with App.post().
+    """
+
     def __init__(self, initial_value):
         self.__initial_value = initial_value
         self.__values = weakref.WeakKeyDictionary()
+        # Values written by other threads, by view and thread, until the UI thread applies them.
+        self.__pending = weakref.WeakKeyDictionary()
+        self.__pending_lock = threading.Lock()
 
     def __set_name__(self, owner, name):
         pass
 
     def __set__(self, view, value):
+        if not UI_THREAD.is_current():
+            # Written from a background thread or a coroutine, the view tree may be walked
+            # right now. The value is applied at the next frame.
+            thread_id = threading.get_ident()
+            # A new tuple for every write tells writes of equal values apart.
+            write = (value, )
+            with self.__pending_lock:
+                self.__pending.setdefault(view, {})[thread_id] = write
+            UI_THREAD.post(lambda: self.__apply(view, thread_id, write))
+            return
         self.__values[view] = value
         view.invalidate_body()
-        # todo request redraw, views shouldn't redraw every frame
+
+    def __apply(self, view, thread_id: int, write: tuple):
+        with self.__pending_lock:
+            pending = self.__pending.get(view)
+            # Later writes of the thread stay visible to it until they are applied too.
+            if pending is not None and pending.get(thread_id) is write:
+                del pending[thread_id]
+                if not pending:
+                    del self.__pending[view]
+        self.__set__(view, write[0])
 
     def __get__(self, view, owner):
+        if self.__pending:
+            with self.__pending_lock:
+                write = self.__pending.get(view, {}).get(threading.get_ident())
+            if write is not None:
+                return write[0]
         if view not in self.__values:
             self.__values[view] = self.__initial_value
         return self.__values[view]
+
+
+def state_properties(view_class: type) -> list:
+    names = []
+    for klass in reversed(view_class.__mro__):
+        for key, value in vars(klass).items():
+            if type(value) == State and key not in names:
+                names.append(key)
+    return names
+
+
+def transfer_state(source, target):
+    """
+    Copies values of State properties present on both views from source to target.
+    """
+    source_properties = state_properties(type(source))
+    for name in state_properties(type(target)):
+        if name in source_properties:
+            setattr(target, name, getattr(source, name))
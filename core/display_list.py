@@ -0,0 +1,460 @@
+import sys
+import math
+import struct
+from array import array
+from typing import Optional
+
+import skia
+
+SAVE = 0
+RESTORE = 1
+TRANSLATE = 2
+SCALE = 3
+CONCAT = 4
+CLIP_RECT = 5
+DRAW_RECT = 6
+DRAW_ROUND_RECT = 7
+DRAW_LINE = 8
+DRAW_TEXT = 9
+DRAW_IMAGE_RECT = 10
+DRAW_LAYER = 11
+
+# Number of float operands and object references each command consumes.
+OPERANDS = {
+    SAVE: (0, 0),
+    RESTORE: (0, 0),
+    TRANSLATE: (2, 0),
+    SCALE: (2, 0),
+    CONCAT: (9, 0),
+    CLIP_RECT: (5, 0),
+    DRAW_RECT: (4, 1),
+    DRAW_ROUND_RECT: (6, 1),
+    DRAW_LINE: (4, 1),
+    DRAW_TEXT: (2, 2),
+    DRAW_IMAGE_RECT: (8, 2),
+    DRAW_LAYER: (5, 1),
+}
+
+MAGIC = b'SKDL'
+VERSION = 1
+
+
+class TextRun:
+    """
+    Text shaped into a TextBlob once at record time.
+    """
+    __slots__ = ('text', 'font', 'blob')
+
+    def __init__(self, text: str, font: skia.Font):
+        self.text = text
+        self.font = font
+        self.blob = skia.TextBlob.MakeFromString(text, font)
+
+
+class LayerContent:
+    """
+    Display list of a layer's subtree along with its rasterized image.
+
+    The image is created on the surface the list is replayed to, so on the GPU backend it stays
+    resident as a texture and is composited again for as long as the subtree does not change.
+    """
+    __slots__ = ('display_list', 'image', 'image_key')
+
+    def __init__(self, display_list: 'DisplayList'):
+        self.display_list = display_list
+        self.image: Optional[skia.Image] = None
+        self.image_key = None
+
+    def rasterize(self, canvas: skia.Canvas, width: float, height: float) -> Optional[skia.Image]:
+        matrix = canvas.getTotalMatrix()
+        scale_x = abs(matrix.getScaleX()) or 1
+        scale_y = abs(matrix.getScaleY()) or 1
+        image_key = (width, height, scale_x, scale_y)
+        if self.image is not None and self.image_key == image_key:
+            return self.image
+
+        surface = canvas.getSurface()
+        if surface is None or width <= 0 or height <= 0:
+            return None
+        layer_surface = surface.makeSurface(math.ceil(width * scale_x), math.ceil(height * scale_y))
+        if layer_surface is None:
+            return None
+        layer_canvas = layer_surface.getCanvas()
+        layer_canvas.clear(skia.ColorTRANSPARENT)
+        layer_canvas.scale(scale_x, scale_y)
+        self.display_list.replay(layer_canvas)
+        self.image = layer_surface.makeImageSnapshot()
+        self.image_key = image_key
+        return self.image
+
+
+def paint_key(paint: Optional[skia.Paint]):
+    if paint is None:
+        return None
+    return paint.getColor(), int(paint.getStyle()), paint.getStrokeWidth(), paint.isAntiAlias()
+
+
+def font_key(font: skia.Font):
+    return font.getSize(), font.isSubpixel(), font.getScaleX(), font.getSkewX()
+
+
+def ref_key(ref):
+    if isinstance(ref, skia.Paint):
+        return paint_key(ref)
+    if isinstance(ref, TextRun):
+        return ref.text, font_key(ref.font)
+    if isinstance(ref, skia.Image):
+        return ref.uniqueID()
+    return ref
+
+
+class DisplayList:
+    """
+    Array-backed list of draw commands recorded from the view tree.
+
+    Commands are stored as opcodes, their float operands in one flat array and object operands
+    (paints, text runs, images) in a list, so that two frames can be compared without touching
+    skia and replayed without calling back into view code.
+    """
+    __slots__ = ('ops', 'floats', 'refs', 'ref_keys')
+
+    def __init__(self):
+        self.ops = array('B')
+        self.floats = array('d')
+        self.refs: list = []
+        self.ref_keys: list = []
+
+    def __len__(self):
+        return len(self.ops)
+
+    def __eq__(self, other):
+        if not isinstance(other, DisplayList):
+            return NotImplemented
+        return self.ops == other.ops and self.floats == other.floats and self.ref_keys == other.ref_keys
+
+    def append(self, op: int, floats=(), refs=()):
+        self.ops.append(op)
+        self.floats.extend(floats)
+        for ref in refs:
+            self.refs.append(ref)
+            self.ref_keys.append(ref_key(ref))
+
+    def replay(self, canvas: skia.Canvas):
+        floats = self.floats
+        refs = self.refs
+        f = 0
+        r = 0
+        # Consecutive unscaled draws from one image, e.g. icons of an atlas page, become a single
+        # drawAtlas call.
+        sprites = _SpriteBatch(canvas)
+        for op in self.ops:
+            if op == DRAW_IMAGE_RECT:
+                image = refs[r]
+                src_width = floats[f + 2] - floats[f]
+                src_height = floats[f + 3] - floats[f + 1]
+                dst_width = floats[f + 6] - floats[f + 4]
+                dst_height = floats[f + 7] - floats[f + 5]
+                if refs[r + 1] is None and src_width == dst_width and src_height == dst_height:
+                    sprites.add(image, floats[f:f + 4], floats[f + 4], floats[f + 5])
+                    f += 8
+                    r += 2
+                    continue
+            if sprites:
+                sprites.flush()
+
+            if op == DRAW_RECT:
+                canvas.drawRect(skia.Rect(floats[f], floats[f + 1], floats[f + 2], floats[f + 3]), refs[r])
+            elif op == DRAW_TEXT:
+                canvas.drawTextBlob(refs[r].blob, floats[f], floats[f + 1], refs[r + 1])
+            elif op == DRAW_ROUND_RECT:
+                canvas.drawRoundRect(
+                    skia.Rect(floats[f], floats[f + 1], floats[f + 2], floats[f + 3]),
+                    floats[f + 4],
+                    floats[f + 5],
+                    refs[r],
+                )
+            elif op == DRAW_LINE:
+                canvas.drawLine(floats[f], floats[f + 1], floats[f + 2], floats[f + 3], refs[r])
+            elif op == DRAW_IMAGE_RECT:
+                canvas.drawImageRect(
+                    refs[r],
+                    skia.Rect(floats[f], floats[f + 1], floats[f + 2], floats[f + 3]),
+                    skia.Rect(floats[f + 4], floats[f + 5], floats[f + 6], floats[f + 7]),
+                    # Passed by keyword, newer bindings take SamplingOptions before the paint.
+                    paint=refs[r + 1],
+                )
+            elif op == SAVE:
+                canvas.save()
+            elif op == RESTORE:
+                canvas.restore()
+            elif op == TRANSLATE:
+                canvas.translate(floats[f], floats[f + 1])
+            elif op == SCALE:
+                canvas.scale(floats[f], floats[f + 1])
+            elif op == CONCAT:
+                canvas.concat(skia.Matrix.MakeAll(*floats[f:f + 9]))
+            elif op == DRAW_LAYER:
+                _draw_layer(canvas, refs[r], *floats[f:f + 5])
+            elif op == CLIP_RECT:
+                canvas.clipRect(
+                    skia.Rect(floats[f], floats[f + 1], floats[f + 2], floats[f + 3]),
+                    skia.ClipOp.kIntersect,
+                    bool(floats[f + 4]),
+                )
+            float_count, ref_count = OPERANDS[op]
+            f += float_count
+            r += ref_count
+        if sprites:
+            sprites.flush()
+
+    def serialize(self) -> bytes:
+        """
+        Encodes the display list so that it can be replayed offline, e.g. for benchmarking.
+        """
+        chunks = [
+            MAGIC,
+            struct.pack('<HIII', VERSION, len(self.ops), len(self.floats), len(self.refs)),
+            self.ops.tobytes(),
+            _little_endian(self.floats).tobytes(),
+        ]
+        for ref in self.refs:
+            chunks.append(_serialize_ref(ref))
+        return b''.join(chunks)
+
+    @classmethod
+    def deserialize(cls, data: bytes) -> 'DisplayList':
+        if data[:4] != MAGIC:
+            raise ValueError('Not a serialized DisplayList.')
+        version, op_count, float_count, ref_count = struct.unpack_from('<HIII', data, 4)
+        if version != VERSION:
+            raise ValueError(f'Unsupported DisplayList version {version}.')
+        offset = 4 + struct.calcsize('<HIII')
+
+        display_list = cls()
+        display_list.ops.frombytes(data[offset:offset + op_count])
+        offset += op_count
+        display_list.floats.frombytes(data[offset:offset + float_count * 8])
+        display_list.floats = _little_endian(display_list.floats)
+        offset += float_count * 8
+
+        for _ in range(ref_count):
+            ref, offset = _deserialize_ref(data, offset)
+            display_list.refs.append(ref)
+            display_list.ref_keys.append(ref_key(ref))
+        return display_list
+
+
+def _draw_layer(canvas: skia.Canvas, content: LayerContent, x: float, y: float, width: float, height: float,
+                opacity: float):
+    bounds = skia.Rect.MakeXYWH(x, y, width, height)
+    image = content.rasterize(canvas, width, height)
+    if image is not None:
+        paint = skia.Paint()
+        paint.setAlphaf(opacity)
+        canvas.drawImageRect(image, bounds, paint=paint)
+        return
+
+    # Canvases without a surface, e.g. while recording a picture, composite the subtree directly.
+    canvas.saveLayerAlpha(bounds, round(opacity * 255))
+    canvas.translate(x, y)
+    content.display_list.replay(canvas)
+    canvas.restore()
+
+
+class _SpriteBatch:
+    __slots__ = ('canvas', 'image', 'xforms', 'src_rects')
+
+    def __init__(self, canvas: skia.Canvas):
+        self.canvas = canvas
+        self.image: Optional[skia.Image] = None
+        self.xforms = []
+        self.src_rects = []
+
+    def __bool__(self):
+        return self.image is not None
+
+    def add(self, image: skia.Image, src, x: float, y: float):
+        if self.image is not None and self.image is not image:
+            self.flush()
+        self.image = image
+        self.xforms.append(skia.RSXform(1, 0, x, y))
+        self.src_rects.append(skia.Rect(*src))
+
+    def flush(self):
+        if len(self.xforms) == 1:
+            src = self.src_rects[0]
+            xform = self.xforms[0]
+            self.canvas.drawImageRect(
+                self.image,
+                src,
+                skia.Rect.MakeXYWH(xform.fTx, xform.fTy, src.width(), src.height()),
+            )
+        else:
+            # Without colors, the blend mode is unused, but the bindings require one.
+            self.canvas.drawAtlas(self.image, self.xforms, self.src_rects, [], skia.BlendMode.kModulate)
+        self.image = None
+        self.xforms = []
+        self.src_rects = []
+
+
+class RecordingCanvas:
+    """
+    Stands in for skia.Canvas while views draw, emitting commands into a DisplayList.
+
+    The canvas tracks its matrix and clip bounds so that views can skip drawing subtrees which
+    would end up outside of the clip, see quickReject().
+    """
+
+    def __init__(self, width: float, height: float):
+        self.width = width
+        self.height = height
+        self.display_list = DisplayList()
+        self.culled_views = 0
+        self.__matrix = skia.Matrix()
+        self.__clip = (0, 0, width, height)
+        self.__saved = []
+
+    def finish(self) -> DisplayList:
+        return self.display_list
+
+    def flush(self):
+        pass
+
+    def save(self):
+        self.__saved.append((self.__matrix, self.__clip))
+        self.display_list.append(SAVE)
+
+    def restore(self):
+        self.__matrix, self.__clip = self.__saved.pop()
+        self.display_list.append(RESTORE)
+
+    def translate(self, dx: float, dy: float):
+        self.__matrix = skia.Matrix.Concat(self.__matrix, skia.Matrix.Translate(dx, dy))
+        self.display_list.append(TRANSLATE, (dx, dy))
+
+    def scale(self, sx: float, sy: float):
+        self.__matrix = skia.Matrix.Concat(self.__matrix, skia.Matrix.Scale(sx, sy))
+        self.display_list.append(SCALE, (sx, sy))
+
+    def concat(self, matrix: skia.Matrix):
+        self.__matrix = skia.Matrix.Concat(self.__matrix, matrix)
+        self.display_list.append(CONCAT, matrix.get9())
+
+    def clipRect(self, rect: skia.Rect, op=skia.ClipOp.kIntersect, do_anti_alias: bool = False):
+        left, top, right, bottom = self.__map_rect(*_rect_operands(rect))
+        clip_left, clip_top, clip_right, clip_bottom = self.__clip
+        self.__clip = (max(left, clip_left), max(top, clip_top), min(right, clip_right), min(bottom, clip_bottom))
+        self.display_list.append(CLIP_RECT, (*_rect_operands(rect), float(do_anti_alias)))
+
+    def getDeviceClipBounds(self) -> skia.Rect:
+        return skia.Rect(*self.__clip)
+
+    def quickReject(self, rect: skia.Rect) -> bool:
+        """
+        Returns True if nothing drawn inside rect would be visible with the current clip.
+        """
+        left, top, right, bottom = self.__map_rect(*_rect_operands(rect))
+        clip_left, clip_top, clip_right, clip_bottom = self.__clip
+        return right <= clip_left or left >= clip_right or bottom <= clip_top or top >= clip_bottom
+
+    def __map_rect(self, left: float, top: float, right: float, bottom: float):
+        matrix = self.__matrix
+        if matrix.isTranslate():
+            dx = matrix.getTranslateX()
+            dy = matrix.getTranslateY()
+            return left + dx, top + dy, right + dx, bottom + dy
+        return _rect_operands(matrix.mapRect(skia.Rect(left, top, right, bottom)))
+
+    def drawRect(self, rect: skia.Rect, paint: skia.Paint):
+        self.display_list.append(DRAW_RECT, _rect_operands(rect), (paint, ))
+
+    def drawRoundRect(self, rect: skia.Rect, rx: float, ry: float, paint: skia.Paint):
+        self.display_list.append(DRAW_ROUND_RECT, (*_rect_operands(rect), rx, ry), (paint, ))
+
+    def drawLine(self, x0: float, y0: float, x1: float, y1: float, paint: skia.Paint):
+        self.display_list.append(DRAW_LINE, (x0, y0, x1, y1), (paint, ))
+
+    def drawString(self, text: str, x: float, y: float, font: skia.Font, paint: skia.Paint):
+        if not text:
+            return
+        self.display_list.append(DRAW_TEXT, (x, y), (TextRun(text, font), paint))
+
+    def drawLayer(self, content: LayerContent, x: float, y: float, width: float, height: float, opacity: float):
+        self.display_list.append(DRAW_LAYER, (x, y, width, height, opacity), (content, ))
+
+    def drawImageRect(self, image: skia.Image, *args, paint: skia.Paint = None):
+        """
+        Accepts both drawImageRect(image, dst[, paint]) and drawImageRect(image, src, dst[, paint]).
+        """
+        rects = [arg for arg in args if isinstance(arg, skia.Rect)]
+        paints = [arg for arg in args if isinstance(arg, skia.Paint)]
+        if len(rects) == 1:
+            rects.insert(0, skia.Rect.MakeWH(image.width(), image.height()))
+        src, dst = rects
+        if paint is None and paints:
+            paint = paints[0]
+        self.display_list.append(
+            DRAW_IMAGE_RECT,
+            (*_rect_operands(src), *_rect_operands(dst)),
+            (image, paint),
+        )
+
+
+def _rect_operands(rect: skia.Rect):
+    return rect.left(), rect.top(), rect.right(), rect.bottom()
+
+
+def _little_endian(values: array) -> array:
+    if sys.byteorder == 'little':
+        return values
+    swapped = array(values.typecode, values)
+    swapped.byteswap()
+    return swapped
+
+
+def _pack_bytes(tag: bytes, payload: bytes) -> bytes:
+    return tag + struct.pack('<I', len(payload)) + payload
+
+
+def _serialize_ref(ref) -> bytes:
+    if ref is None:
+        return _pack_bytes(b'N', b'')
+    if isinstance(ref, skia.Paint):
+        color, style, stroke_width, anti_alias = paint_key(ref)
+        return _pack_bytes(b'P', struct.pack('<IifB', color, style, stroke_width, anti_alias))
+    if isinstance(ref, TextRun):
+        size, subpixel, scale_x, skew_x = font_key(ref.font)
+        header = struct.pack('<fBff', size, subpixel, scale_x, skew_x)
+        return _pack_bytes(b'T', header + ref.text.encode())
+    if isinstance(ref, skia.Image):
+        return _pack_bytes(b'I', bytes(ref.encodeToData()))
+    if isinstance(ref, LayerContent):
+        return _pack_bytes(b'L', ref.display_list.serialize())
+    raise TypeError(f'Cannot serialize display list operand {ref!r}')
+
+
+def _deserialize_ref(data: bytes, offset: int):
+    tag = data[offset:offset + 1]
+    length, = struct.unpack_from('<I', data, offset + 1)
+    offset += 5
+    payload = data[offset:offset + length]
+    offset += length
+
+    if tag == b'N':
+        return None, offset
+    if tag == b'P':
+        color, style, stroke_width, anti_alias = struct.unpack('<IifB', payload)
+        paint = skia.Paint(Color=color, Style=skia.Paint.Style(style), StrokeWidth=stroke_width)
+        paint.setAntiAlias(bool(anti_alias))
+        return paint, offset
+    if tag == b'T':
+        header_size = struct.calcsize('<fBff')
+        size, subpixel, scale_x, skew_x = struct.unpack('<fBff', payload[:header_size])
+        font = skia.Font(None, size, scale_x, skew_x)
+        font.setSubpixel(bool(subpixel))
+        return TextRun(payload[header_size:].decode(), font), offset
+    if tag == b'I':
+        return skia.Image.MakeFromEncoded(skia.Data.MakeWithCopy(payload)), offset
+    if tag == b'L':
+        return LayerContent(DisplayList.deserialize(payload)), offset
+    raise ValueError(f'Unknown display list operand tag {tag!r}')
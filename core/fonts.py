@@ -0,0 +1,25 @@
+from typing import Dict, Tuple
+
+import skia
+
+_FONTS: Dict[Tuple[float, bool], skia.Font] = {}
+
+
+def get_font(size: float, subpixel: bool = False) -> skia.Font:
+    """
+    Returns a shared font of the default typeface. Callers must not modify it.
+    """
+    font = _FONTS.get((size, subpixel))
+    if font is None:
+        font = skia.Font(None, size)
+        font.setSubpixel(subpixel)
+        _FONTS[(size, subpixel)] = font
+    return font
+
+
+def get_line_height(font: skia.Font) -> Tuple[float, float]:
+    """
+    Returns the line height and the distance from the baseline to the bottom of the line.
+    """
+    metrics = font.getMetrics()
+    return abs(metrics.fTop) + abs(metrics.fBottom), metrics.fBottom
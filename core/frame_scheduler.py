@@ -0,0 +1,119 @@
+import heapq
+import itertools
+import threading
+import time
+from typing import Callable, List, Optional
+
+from .frame_stats import FrameStats
+
+
+class Timer:
+    __slots__ = ('deadline', 'callback', 'cancelled')
+
+    def __init__(self, deadline: float, callback: Callable[[], None]):
+        self.deadline = deadline
+        self.callback = callback
+        self.cancelled = False
+
+    def cancel(self):
+        self.cancelled = True
+
+
+class FrameScheduler:
+    """
+    Paces frames to the target frame rate and decides how long the event loop may sleep.
+
+    Timers run once their deadline passes, animation frame callbacks run at most once per frame
+    interval. When neither is pending and no redraw was requested the loop sleeps until the next
+    input event.
+    """
+
+    def __init__(self, target_fps: Optional[float] = 60, wake: Callable[[], None] = None):
+        self.target_fps = target_fps
+        self.__wake = wake or (lambda: None)
+        self.__lock = threading.Lock()
+        self.__timers = []
+        self.__timer_counter = itertools.count()
+        self.__animation_callbacks: List[Callable[[float], None]] = []
+        self.__last_frame_time: Optional[float] = None
+        self.__frame_deadline: Optional[float] = None
+
+    @property
+    def frame_interval(self) -> float:
+        return 1 / self.target_fps if self.target_fps else 0
+
+    @property
+    def animating(self) -> bool:
+        return bool(self.__animation_callbacks)
+
+    def call_later(self, delay: float, callback: Callable[[], None]) -> Timer:
+        timer = Timer(time.perf_counter() + delay, callback)
+        with self.__lock:
+            heapq.heappush(self.__timers, (timer.deadline, next(self.__timer_counter), timer))
+            earliest = self.__timers[0][2] is timer
+        if earliest:
+            self.__wake()
+        return timer
+
+    def request_animation_frame(self, callback: Callable[[float], None]):
+        """
+        Calls callback with the frame time before the next frame. Animations request a frame
+        again from the callback for as long as they run.
+        """
+        with self.__lock:
+            self.__animation_callbacks.append(callback)
+            first = len(self.__animation_callbacks) == 1
+        if first:
+            self.__wake()
+
+    def next_frame_time(self) -> float:
+        if self.__last_frame_time is None:
+            return 0
+        return self.__last_frame_time + self.frame_interval
+
+    def has_due_work(self, now: float) -> bool:
+        with self.__lock:
+            if self.__timers and self.__timers[0][0] <= now:
+                return True
+            return bool(self.__animation_callbacks) and self.next_frame_time() <= now
+
+    def run_due(self, now: float):
+        due_timers = []
+        animation_callbacks = []
+        with self.__lock:
+            while self.__timers and self.__timers[0][0] <= now:
+                due_timers.append(heapq.heappop(self.__timers)[2])
+            if self.__animation_callbacks and self.next_frame_time() <= now:
+                animation_callbacks = self.__animation_callbacks
+                self.__animation_callbacks = []
+
+        for timer in due_timers:
+            if not timer.cancelled:
+                timer.callback()
+        for callback in animation_callbacks:
+            callback(now)
+
+    def wait_timeout(self, now: float, redraw_pending: bool = False) -> Optional[float]:
+        """
+        Returns how long the event loop may wait for events, None meaning until the next event.
+        """
+        deadlines = []
+        with self.__lock:
+            if redraw_pending or self.__animation_callbacks:
+                deadlines.append(self.next_frame_time())
+            while self.__timers and self.__timers[0][2].cancelled:
+                heapq.heappop(self.__timers)
+            if self.__timers:
+                deadlines.append(self.__timers[0][0])
+        if not deadlines:
+            return None
+        return max(0.0, min(deadlines) - now)
+
+    def frame_presented(self, present_time: float, stats: FrameStats):
+        if self.__frame_deadline is not None:
+            stats.record_deadline(present_time, self.__frame_deadline, self.frame_interval)
+        self.__last_frame_time = present_time
+        # Only frames of a running animation have a deadline, idle gaps are not dropped frames.
+        self.__frame_deadline = None
+        if self.animating and self.frame_interval:
+            self.__frame_deadline = present_time + self.frame_interval
@@ -0,0 +1,87 @@
+import statistics
+from collections import deque
+from typing import Iterable, Optional
+
+
+class FrameStats:
+    """
+    Keeps a rolling history of frame intervals and input-to-present latencies, and counts frames
+    presented after their deadline.
+    """
+    __slots__ = (
+        'frame_intervals', 'input_latencies', 'late_frames', 'dropped_frames', 'culled_views',
+        'queue_depths', 'drain_times', '__last_present_time',
+    )
+
+    def __init__(self, history: int = 240):
+        self.frame_intervals = deque(maxlen=history)
+        self.input_latencies = deque(maxlen=history)
+        self.late_frames = 0
+        self.dropped_frames = 0
+        self.culled_views = deque(maxlen=history)
+        self.queue_depths = deque(maxlen=history)
+        self.drain_times = deque(maxlen=history)
+        self.__last_present_time: Optional[float] = None
+
+    def record_culled(self, culled_views: int):
+        """
+        Records how many views were skipped while recording a frame for being outside of the clip.
+        """
+        self.culled_views.append(culled_views)
+
+    def record_drain(self, queue_depth: int, drain_time: float):
+        """
+        Records how many tasks posted to the UI thread ran at a frame boundary and how long they took.
+        """
+        self.queue_depths.append(queue_depth)
+        self.drain_times.append(drain_time)
+
+    def record_present(self, present_time: float, input_times: Iterable[float] = ()):
+        if self.__last_present_time is not None:
+            self.frame_intervals.append(present_time - self.__last_present_time)
+        self.__last_present_time = present_time
+        for input_time in input_times:
+            self.input_latencies.append(present_time - input_time)
+
+    def record_deadline(self, present_time: float, deadline: float, frame_interval: float):
+        """
+        A frame is late when presented more than half a frame interval after its deadline, every
+        whole interval it missed counts as a dropped frame.
+        """
+        lateness = present_time - deadline
+        if lateness > frame_interval / 2:
+            self.late_frames += 1
+            self.dropped_frames += int(lateness / frame_interval + 0.5)
+
+    def reset(self):
+        self.frame_intervals.clear()
+        self.input_latencies.clear()
+        self.late_frames = 0
+        self.dropped_frames = 0
+        self.culled_views.clear()
+        self.queue_depths.clear()
+        self.drain_times.clear()
+        self.__last_present_time = None
+
+    def summary(self) -> dict:
+        return {
+            'frames': len(self.frame_intervals),
+            'late_frames': self.late_frames,
+            'dropped_frames': self.dropped_frames,
+            'frame_interval_ms': _describe(self.frame_intervals),
+            'input_latency_ms': _describe(self.input_latencies),
+            'culled_views': self.culled_views[-1] if self.culled_views else None,
+            'max_queue_depth': max(self.queue_depths) if self.queue_depths else None,
+            'drain_ms': _describe(self.drain_times),
+        }
+
+
+def _describe(samples) -> Optional[dict]:
+    if not samples:
+        return None
+    ordered = sorted(samples)
+    return {
+        'mean': round(statistics.fmean(ordered) * 1000, 3),
+        'p95': round(ordered[int((len(ordered) - 1) * 0.95)] * 1000, 3),
+        'max': round(ordered[-1] * 1000, 3),
+    }
@@ -0,0 +1,123 @@
+import struct
+import time
+from typing import BinaryIO, Iterator, List, Optional, Tuple
+
+MAGIC = b'SKIN'
+VERSION = 1
+
+CURSOR_POS = 0
+MOUSE_BUTTON = 1
+KEY = 2
+CHAR = 3
+RESIZE = 4
+
+HEADER = struct.Struct('<4sHII')
+# Seconds since the start of the recording and the event kind.
+EVENT = struct.Struct('<dB')
+PAYLOADS = {
+    CURSOR_POS: struct.Struct('<dd'),
+    MOUSE_BUTTON: struct.Struct('<bbh'),
+    KEY: struct.Struct('<hibh'),
+    CHAR: struct.Struct('<I'),
+    RESIZE: struct.Struct('<II'),
+}
+
+
+class InputEvent:
+    __slots__ = ('time', 'kind', 'args')
+
+    def __init__(self, time: float, kind: int, args: tuple):
+        self.time = time
+        self.kind = kind
+        self.args = args
+
+
+class InputRecorder:
+    """
+    Writes input events with their timestamps to a compact binary trace.
+    """
+
+    def __init__(self, path: str, window_size: Tuple[int, int]):
+        self.__file: BinaryIO = open(path, 'wb')
+        self.__file.write(HEADER.pack(MAGIC, VERSION, *window_size))
+        self.__start_time = time.perf_counter()
+
+    def record(self, kind: int, *args):
+        self.__file.write(EVENT.pack(time.perf_counter() - self.__start_time, kind))
+        self.__file.write(PAYLOADS[kind].pack(*args))
+
+    def close(self):
+        self.__file.close()
+
+
+def read_trace(path: str) -> Tuple[Tuple[int, int], List[InputEvent]]:
+    """
+    Returns the window size the trace was recorded at and its events.
+    """
+    with open(path, 'rb') as file:
+        data = file.read()
+    magic, version, width, height = HEADER.unpack_from(data)
+    if magic != MAGIC or version != VERSION:
+        raise ValueError(f'"{path}" is not an input trace.')
+    return (width, height), list(_iter_events(data, HEADER.size))
+
+
+def _iter_events(data: bytes, offset: int) -> Iterator[InputEvent]:
+    while offset < len(data):
+        event_time, kind = EVENT.unpack_from(data, offset)
+        offset += EVENT.size
+        payload = PAYLOADS[kind]
+        yield InputEvent(event_time, kind, payload.unpack_from(data, offset))
+        offset += payload.size
+
+
+class ReplayResult:
+    __slots__ = ('events', 'latencies')
+
+    def __init__(self):
+        self.events: List[InputEvent] = []
+        # Seconds from dispatching an event to its frame being rendered, None when the event
+        # did not change the frame.
+        self.latencies: List[Optional[float]] = []
+
+    def summary(self) -> dict:
+        latencies = sorted(latency for latency in self.latencies if latency is not None)
+        if not latencies:
+            return {'events': len(self.events), 'frames': 0}
+        return {
+            'events': len(self.events),
+            'frames': len(latencies),
+            'mean_ms': sum(latencies) / len(latencies) * 1000,
+            'p95_ms': latencies[int(len(latencies) * 0.95)] * 1000,
+            'max_ms': latencies[-1] * 1000,
+        }
+
+
+def replay_trace(app, path: str, realtime: bool = False) -> ReplayResult:
+    """
+    Feeds a recorded trace to a headless app, rendering a frame after every event. With realtime,
+    events are spaced as they were recorded, so that timers and animations run as they did.
+    """
+    window_size, events = read_trace(path)
+    app.start_headless(*window_size)
+    dispatch = {
+        CURSOR_POS: app.handle_cursor_pos,
+        MOUSE_BUTTON: app.handle_mouse_button,
+        KEY: app.handle_key,
+        CHAR: app.handle_char,
+        RESIZE: app.handle_resize,
+    }
+
+    result = ReplayResult()
+    start_time = time.perf_counter()
+    for event in events:
+        if realtime:
+            delay = start_time + event.time - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+        dispatch_time = time.perf_counter()
+        dispatch[event.kind](*event.args)
+        presented = app.run_frame()
+        result.events.append(event)
+        result.latencies.append(time.perf_counter() - dispatch_time if presented else None)
+    return result
@@ -1,10 +1,13 @@
+import itertools
 import weakref
+from typing import Optional, Callable, Dict, Hashable, Tuple
 
 from .base import View
 from .singleton import Singleton
 
 
 class Keys:
+    TAB = 258
     BACKSPACE = 259
     ARROW_RIGHT = 262
     ARROW_LEFT = 263
@@ -12,27 +15,126 @@ class Keys:
     RIGHT_SHIFT = 344
 
 
+class Mods:
+    SHIFT = 0x0001
+
+
 class KeyListener:
-    def handle_char(self, char: str):
+    __slots__ = ()
+
+    def handle_char(self, char: str) -> Optional[bool]:
+        """
+        Return True to stop the event from bubbling up to parent listeners.
+        """
         pass
 
-    def handle_key(self, key: int, action: int):
+    def handle_key(self, key: int, action: int) -> Optional[bool]:
+        """
+        Return True to stop the event from bubbling up to parent listeners.
+        """
         pass
 
+    def handle_focus(self, focused: bool):
+        pass
+
+    def focus_key(self) -> Optional[Hashable]:
+        """
+        Listeners rebuilt with the same focus key keep the focus and the tab position of their
+        predecessor.
+        """
+        return None
+
 
 class KeyInput(metaclass=Singleton):
-    __slots__ = ('__listeners', )
+    """
+    Delivers key events to the focused listener only, bubbling them up its parent chain until a
+    listener handles them. Tab and Shift+Tab move focus in registration order.
+    """
+    __slots__ = ('__tab_order', '__tab_counter', '__key_order', '__focused', '__focus_key', 'bubbling', )
 
     def __init__(self):
-        self.__listeners = weakref.WeakSet()
+        self.__tab_order = weakref.WeakKeyDictionary()
+        self.__tab_counter = itertools.count()
+        # Tab position and last listener of every focus key, kept while listeners are rebuilt.
+        self.__key_order: Dict[Hashable, Tuple[int, weakref.ref]] = {}
+        self.__focused: Optional[weakref.ref] = None
+        self.__focus_key: Optional[Hashable] = None
+        self.bubbling = True
+
+    @property
+    def focused_view(self) -> Optional[View]:
+        return self.__focused() if self.__focused is not None else None
+
+    def is_focusable(self, view: View) -> bool:
+        return view in self.__tab_order
+
+    def focus(self, listener: Optional[View]):
+        previous = self.focused_view
+        if previous is listener:
+            return
+        self.__set_focused(listener)
+        if previous is not None:
+            previous.handle_focus(False)
+        if listener is not None:
+            listener.handle_focus(True)
+
+    def focus_next(self, reverse: bool = False):
+        listeners = [listener for listener, _ in sorted(self.__tab_order.items(), key=lambda item: item[1])]
+        # Keys of listeners that were not rebuilt are gone for good.
+        live_keys = {listener.focus_key() for listener in listeners}
+        self.__key_order = {key: index for key, index in self.__key_order.items() if key in live_keys}
+        if not listeners:
+            return
+        current = self.focused_view
+        if current in self.__tab_order:
+            index = listeners.index(current) + (-1 if reverse else 1)
+            self.focus(listeners[index % len(listeners)])
+        else:
+            self.focus(listeners[-1 if reverse else 0])
 
     def char_callback(self, window, codepoint: int):
-        for instance in self.__listeners:
-            instance.handle_char(chr(codepoint))
+        char = chr(codepoint)
+        self.__dispatch(lambda listener: listener.handle_char(char))
 
     def key_callback(self, window, key: int, scancode: int, action: int, mods: int):
-        for instance in self.__listeners:
-            instance.handle_key(key, action)
+        if key == Keys.TAB and action != 0:
+            self.focus_next(reverse=bool(mods & Mods.SHIFT))
+            return
+        self.__dispatch(lambda listener: listener.handle_key(key, action))
+
+    def __dispatch(self, handle: Callable[[KeyListener], Optional[bool]]):
+        view = self.focused_view
+        while view is not None:
+            if view in self.__tab_order and handle(view):
+                return
+            if not self.bubbling:
+                return
+            view = view.parent
+
+    def __set_focused(self, listener: Optional[View]):
+        self.__focused = weakref.ref(listener) if listener is not None else None
+        self.__focus_key = listener.focus_key() if listener is not None else None
 
     def add_listener(self, listener: View):
-        self.__listeners.add(listener)
+        focus_key = listener.focus_key()
+        if listener not in self.__tab_order:
+            # A rebuilt listener takes the tab position of its predecessor, so a partial rebuild
+            # does not move it to the end of the tab order.
+            key_order = self.__key_order.get(focus_key) if focus_key is not None else None
+            if key_order is None:
+                order = next(self.__tab_counter)
+            else:
+                order, predecessor = key_order
+                # The predecessor may only be collected later, it must not be tabbed to.
+                previous = predecessor()
+                if previous is not None:
+                    self.__tab_order.pop(previous, None)
+            if focus_key is not None:
+                self.__key_order[focus_key] = (order, weakref.ref(listener))
+            self.__tab_order[listener] = order
+
+        # Listeners are registered while their parent's body is rebuilt, before they are drawn,
+        # so focus is handed over without notifying them.
+        nothing_focused = self.focused_view is None and self.__focus_key is None
+        if nothing_focused or (focus_key is not None and focus_key == self.__focus_key):
+            self.__set_focused(listener)
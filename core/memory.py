@@ -0,0 +1,99 @@
+import sys
+from typing import Dict, Iterator, List
+
+from .base import View, Layer, ViewPrivate, NO_CHILDREN, NO_SPACING
+
+# Objects a view owns besides itself. Shared defaults and values like numbers, colors or
+# bindings are not counted.
+_OWNED_TYPES = (list, dict, set, tuple, Layer, ViewPrivate)
+_SHARED = (NO_CHILDREN, NO_SPACING)
+
+
+class ClassMemory:
+    __slots__ = ('count', 'bytes')
+
+    def __init__(self):
+        self.count = 0
+        self.bytes = 0
+
+    @property
+    def bytes_per_view(self) -> float:
+        return self.bytes / self.count if self.count else 0
+
+
+def _get_slot_names(cls: type) -> List[str]:
+    names = []
+    for klass in cls.__mro__:
+        slots = klass.__dict__.get('__slots__', ())
+        if isinstance(slots, str):
+            slots = (slots, )
+        for name in slots:
+            if name.startswith('__') and not name.endswith('__'):
+                # Private slots are name mangled.
+                name = f'_{klass.__name__.lstrip("_")}{name}'
+            names.append(name)
+    return names
+
+
+def get_view_size(view: View) -> int:
+    """
+    Returns the approximate number of bytes taken by the view and the containers, layer and
+    instance dict it owns.
+    """
+    size = sys.getsizeof(view)
+    values = []
+    for name in _get_slot_names(type(view)):
+        if name not in ('__dict__', '__weakref__'):
+            values.append(getattr(view, name, None))
+    instance_dict = getattr(view, '__dict__', None)
+    if instance_dict is not None:
+        size += sys.getsizeof(instance_dict)
+        values.extend(instance_dict.values())
+
+    for value in values:
+        if isinstance(value, _OWNED_TYPES) and not any(value is shared for shared in _SHARED):
+            size += sys.getsizeof(value)
+    return size
+
+
+def iter_tree(root: View) -> Iterator[View]:
+    """
+    Yields the view and every view below it, including built bodies.
+    """
+    stack = [root]
+    while stack:
+        view = stack.pop()
+        yield view
+        stack.extend(view.get_children())
+        # A body root created inside body() is already one of the children.
+        body = view._View__body  # noqa
+        if body is not None and body.parent is not view:
+            stack.append(body)
+
+
+def measure_tree(root: View) -> Dict[str, ClassMemory]:
+    """
+    Returns the number of views and the bytes they take per view class, for a tree that was
+    drawn at least once.
+    """
+    memory: Dict[str, ClassMemory] = {}
+    for view in iter_tree(root):
+        class_memory = memory.get(type(view).__qualname__)
+        if class_memory is None:
+            class_memory = memory[type(view).__qualname__] = ClassMemory()
+        class_memory.count += 1
+        class_memory.bytes += get_view_size(view)
+    return memory
+
+
+def format_memory_report(memory: Dict[str, ClassMemory]) -> str:
+    lines = []
+    for name, class_memory in sorted(memory.items(), key=lambda item: -item[1].bytes):
+        lines.append(
+            f'{name}: {class_memory.count} views, {class_memory.bytes} bytes, '
+            f'{class_memory.bytes_per_view:.0f} bytes per view'
+        )
+    total_count = sum(class_memory.count for class_memory in memory.values())
+    total_bytes = sum(class_memory.bytes for class_memory in memory.values())
+    lines.append(f'Total: {total_count} views, {total_bytes} bytes')
+    return '\n'.join(lines)
@@ -0,0 +1,133 @@
+import os
+from concurrent.futures import ThreadPoolExecutor, Executor
+from typing import Optional
+
+import numpy as np
+import skia
+
+from .base import View, HOVER_STACK
+from .display_list import DisplayList, RecordingCanvas
+from .key_input import KeyInput
+
+_executor: Optional[ThreadPoolExecutor] = None
+
+# Pixels drawn around every tile and cropped, see rasterize_tiled().
+TILE_MARGIN = 8
+
+
+def get_executor() -> ThreadPoolExecutor:
+    """
+    Returns the thread pool shared by tiled rendering, with a thread per core.
+    """
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(os.cpu_count(), thread_name_prefix='raster')
+    return _executor
+
+
+def record_view(view: View, width: int, height: int) -> DisplayList:
+    """
+    Records the view tree into a display list without a window. The hover stack of the app is
+    left untouched.
+    """
+    if view.get_context_property(KeyInput) is None:
+        view.context(KeyInput())
+    hover_start = len(HOVER_STACK)
+    canvas = RecordingCanvas(width, height)
+    try:
+        view.draw(canvas, 0, 0, width, height)
+    finally:
+        del HOVER_STACK[hover_start:]
+    return canvas.finish()
+
+
+def record_picture(display_list: DisplayList, width: float, height: float) -> skia.Picture:
+    recorder = skia.PictureRecorder()
+    canvas = recorder.beginRecording(skia.Rect.MakeWH(width, height))
+    display_list.replay(canvas)
+    return recorder.finishRecordingAsPicture()
+
+
+def _make_surface(pixels: np.ndarray) -> skia.Surface:
+    return skia.Surface(pixels, colorType=skia.kRGBA_8888_ColorType, alphaType=skia.kPremul_AlphaType)
+
+
+def _rasterize_tile(picture: skia.Picture, scale: float, background: int, left: int, top: int,
+                    width: int, height: int) -> np.ndarray:
+    pixels = np.zeros((height, width, 4), dtype=np.uint8)
+    with _make_surface(pixels) as canvas:
+        canvas.clear(background)
+        canvas.translate(-left, -top)
+        canvas.scale(scale, scale)
+        canvas.drawPicture(picture)
+    return pixels
+
+
+def rasterize_tiled(display_list: DisplayList, width: int, height: int, scale: float = 1,
+                    background: int = skia.ColorWHITE, tile_size: int = 512,
+                    executor: Executor = None) -> np.ndarray:
+    """
+    Rasterizes the display list in tiles of tile_size pixels on a thread pool and composites them
+    into one array. The list is turned into a skia.Picture once, which all tiles play back.
+    """
+    executor = executor or get_executor()
+    picture = record_picture(display_list, width, height)
+    pixels = np.empty((int(height * scale), int(width * scale), 4), dtype=np.uint8)
+    pixel_height, pixel_width = pixels.shape[:2]
+
+    tiles = []
+    for top in range(0, pixel_height, tile_size):
+        for left in range(0, pixel_width, tile_size):
+            # Shapes crossing the edge of a surface are rasterized slightly differently close to
+            # it, tiles are drawn with a margin that is cropped, so no seams show.
+            margin_left = min(TILE_MARGIN, left)
+            margin_top = min(TILE_MARGIN, top)
+            tile_right = min(left + tile_size + TILE_MARGIN, pixel_width)
+            tile_bottom = min(top + tile_size + TILE_MARGIN, pixel_height)
+            future = executor.submit(
+                _rasterize_tile, picture, scale, background, left - margin_left, top - margin_top,
+                tile_right - left + margin_left, tile_bottom - top + margin_top,
+            )
+            tiles.append((left, top, margin_left, margin_top, future))
+
+    for left, top, margin_left, margin_top, future in tiles:
+        tile = future.result()[margin_top:margin_top + tile_size, margin_left:margin_left + tile_size]
+        pixels[top:top + tile.shape[0], left:left + tile.shape[1]] = tile
+    return pixels
+
+
+def render_view(view: View, width: int, height: int, scale: float = 1,
+                background: int = skia.ColorWHITE, tile_size: Optional[int] = None) -> np.ndarray:
+    """
+    Renders the view on the CPU and returns its pixels as an RGBA array of shape
+    (height * scale, width * scale, 4). Skia draws straight into the array.
+
+    With a tile_size, large images are rasterized in tiles on a thread pool, see rasterize_tiled().
+    """
+    display_list = record_view(view, width, height)
+    if tile_size is not None and (width * scale > tile_size or height * scale > tile_size):
+        return rasterize_tiled(display_list, width, height, scale, background, tile_size)
+
+    pixels = np.zeros((int(height * scale), int(width * scale), 4), dtype=np.uint8)
+    with _make_surface(pixels) as canvas:
+        canvas.clear(background)
+        canvas.scale(scale, scale)
+        display_list.replay(canvas)
+    return pixels
+
+
+def encode_pixels(pixels: np.ndarray, image_format: skia.EncodedImageFormat = skia.kPNG, quality: int = 100) -> bytes:
+    """
+    Encodes premultiplied RGBA pixels, as returned by render_view(), into an image file.
+    """
+    image = skia.Image.fromarray(pixels, colorType=skia.kRGBA_8888_ColorType, alphaType=skia.kPremul_AlphaType)
+    data = image.encodeToData(image_format, quality)
+    if data is None:
+        raise ValueError(f'Could not encode the pixels as {image_format}.')
+    return bytes(data)
+
+
+def write_image(path: str, pixels: np.ndarray, image_format: skia.EncodedImageFormat = skia.kPNG,
+                quality: int = 100):
+    with open(path, 'wb') as file:
+        file.write(encode_pixels(pixels, image_format, quality))
@@ -0,0 +1,95 @@
+import re
+from collections import OrderedDict
+from typing import List, Tuple
+
+from .fonts import get_font, get_line_height
+
+CACHE_SIZE = 1024
+LAYOUTS_PER_PARAGRAPH = 4
+
+_WORD = re.compile(r'\S+\s*|\s+')
+
+
+class Line:
+    __slots__ = ('text', 'width')
+
+    def __init__(self, text: str, width: float):
+        self.text = text
+        self.width = width
+
+
+class Paragraph:
+    """
+    Text split into words measured once. Breaking it into lines for a new width only walks the
+    cached word widths, so re-layout during window resizing does not measure text again.
+    """
+    __slots__ = ('text', 'size', 'line_height', 'descent', '__paragraphs', '__layouts')
+
+    def __init__(self, text: str, size: float):
+        self.text = text
+        self.size = size
+        font = get_font(size)
+        self.line_height, self.descent = get_line_height(font)
+
+        # Hard line breaks split the text into paragraphs of words: (word, width, width without
+        # trailing whitespace).
+        self.__paragraphs: List[List[Tuple[str, float, float]]] = []
+        for paragraph in text.split('\n'):
+            words = []
+            for word in _WORD.findall(paragraph):
+                stripped = word.rstrip()
+                width = font.measureText(word)
+                stripped_width = font.measureText(stripped) if stripped != word else width
+                words.append((word, width, stripped_width))
+            self.__paragraphs.append(words)
+        self.__layouts: 'OrderedDict[float, List[Line]]' = OrderedDict()
+
+    def layout(self, max_width: float = None) -> List[Line]:
+        key = float('inf') if max_width is None else max_width
+        lines = self.__layouts.get(key)
+        if lines is not None:
+            self.__layouts.move_to_end(key)
+            return lines
+
+        lines = []
+        for words in self.__paragraphs:
+            line_words = []
+            line_width = 0
+            line_stripped_width = 0
+            for word, width, stripped_width in words:
+                if line_words and line_width + stripped_width > key:
+                    lines.append(Line(''.join(line_words).rstrip(), line_stripped_width))
+                    line_words = []
+                    line_width = 0
+                line_words.append(word)
+                line_stripped_width = line_width + stripped_width
+                line_width += width
+            lines.append(Line(''.join(line_words).rstrip(), line_stripped_width))
+
+        self.__layouts[key] = lines
+        if len(self.__layouts) > LAYOUTS_PER_PARAGRAPH:
+            self.__layouts.popitem(last=False)
+        return lines
+
+    def measure(self, max_width: float = None) -> Tuple[float, float]:
+        lines = self.layout(max_width)
+        return max(line.width for line in lines), len(lines) * self.line_height
+
+
+_PARAGRAPHS: 'OrderedDict[Tuple[str, float], Paragraph]' = OrderedDict()
+
+
+def get_paragraph(text: str, size: float) -> Paragraph:
+    """
+    Returns the cached paragraph for the text and font size, reusing it across frames.
+    """
+    key = (text, size)
+    paragraph = _PARAGRAPHS.get(key)
+    if paragraph is None:
+        paragraph = Paragraph(text, size)
+        _PARAGRAPHS[key] = paragraph
+        if len(_PARAGRAPHS) > CACHE_SIZE:
+            _PARAGRAPHS.popitem(last=False)
+    else:
+        _PARAGRAPHS.move_to_end(key)
+    return paragraph
@@ -0,0 +1,91 @@
+import queue
+import threading
+import traceback
+from typing import Callable, List, Optional
+
+from .display_list import DisplayList
+
+_STOP = object()
+
+
+class Frame:
+    __slots__ = ('display_list', 'input_times')
+
+    def __init__(self, display_list: DisplayList, input_times: List[float]):
+        self.display_list = display_list
+        self.input_times = input_times
+
+
+class RenderPipeline:
+    """
+    Runs input handling, body rebuilds and recording on a UI-logic thread.
+
+    Recorded frames are handed over through a single slot, so the render thread always presents
+    the latest frame and never waits for the tree to be rebuilt.
+    """
+
+    def __init__(self, record_frame: Callable[[], Optional[DisplayList]], wake: Callable[[], None]):
+        self.__record_frame = record_frame
+        self.__wake = wake
+        self.__tasks = queue.SimpleQueue()
+        self.__frame: Optional[Frame] = None
+        self.__frame_lock = threading.Lock()
+        self.__thread = threading.Thread(target=self.__run, name='ui-logic', daemon=True)
+
+    def start(self):
+        self.__thread.start()
+
+    def stop(self):
+        self.__tasks.put((_STOP, None))
+        self.__thread.join()
+
+    def submit(self, task: Optional[Callable[[], None]], timestamp: Optional[float] = None):
+        """
+        Runs task on the UI-logic thread and records a new frame afterwards.
+        """
+        self.__tasks.put((task, timestamp))
+
+    def request_frame(self):
+        self.submit(None)
+
+    def take_frame(self) -> Optional[Frame]:
+        with self.__frame_lock:
+            frame = self.__frame
+            self.__frame = None
+        return frame
+
+    def __run(self):
+        # Inputs handled since the last recorded frame, frames that record nothing carry them over.
+        input_times = []
+        while True:
+            task, timestamp = self.__tasks.get()
+            while True:
+                if task is _STOP:
+                    return
+                if task is not None:
+                    # A failing handler is reported, the UI-logic thread keeps running.
+                    try:
+                        task()
+                    except Exception:
+                        traceback.print_exc()
+                if timestamp is not None:
+                    input_times.append(timestamp)
+                try:
+                    task, timestamp = self.__tasks.get_nowait()
+                except queue.Empty:
+                    break
+
+            try:
+                display_list = self.__record_frame()
+            except Exception:
+                traceback.print_exc()
+                continue
+            if display_list is None:
+                continue
+            with self.__frame_lock:
+                if self.__frame is not None:
+                    # The previous frame was never presented, its inputs are shown by this one.
+                    input_times = self.__frame.input_times + input_times
+                self.__frame = Frame(display_list, input_times)
+            input_times = []
+            self.__wake()
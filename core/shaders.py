@@ -0,0 +1,47 @@
+import skia
+
+from .fonts import get_font
+
+
+def warm_up(context: skia.GrDirectContext):
+    """
+    Draws the primitives views use into an offscreen surface, so that their shader programs are
+    compiled before the first frame.
+
+    Compiled programs are not kept between runs: skia-python does not bind
+    GrContextOptions.PersistentCache, so there is no way to hand Skia an on-disk shader cache.
+    """
+    surface = skia.Surface.MakeRenderTarget(
+        context, skia.Budgeted.kNo, skia.ImageInfo.MakeN32Premul(256, 256),
+    )
+    if surface is None:
+        return
+
+    canvas = surface.getCanvas()
+    fill = skia.Paint(Color=skia.ColorBLUE)
+    stroke = skia.Paint(Color=skia.ColorBLACK, Style=skia.Paint.kStroke_Style)
+    canvas.drawRect(skia.Rect.MakeXYWH(0, 0, 64, 32), fill)
+    canvas.drawRoundRect(skia.Rect.MakeXYWH(0, 40, 64, 32), 8, 8, fill)
+    canvas.drawRoundRect(skia.Rect.MakeXYWH(0, 80, 64, 32), 8, 8, stroke)
+    canvas.drawLine(0, 120, 64, 120, stroke)
+    for size, subpixel in ((14, False), (16, True)):
+        canvas.drawString('Skooter', 80, 20 + size, get_font(size, subpixel), fill)
+
+    image_surface = skia.Surface(32, 32)
+    image_surface.getCanvas().clear(skia.ColorRED)
+    image = image_surface.makeImageSnapshot()
+    canvas.drawImageRect(image, skia.Rect.MakeXYWH(80, 80, 48, 48))
+    # Same call as sprite batches of the display list replay.
+    canvas.drawAtlas(
+        image,
+        [skia.RSXform(1, 0, 140, 80), skia.RSXform(1, 0, 180, 80)],
+        [skia.Rect.MakeWH(32, 32)] * 2,
+        [],
+        skia.BlendMode.kModulate,
+    )
+
+    canvas.saveLayerAlpha(skia.Rect.MakeXYWH(0, 160, 64, 64), 128)
+    canvas.drawRect(skia.Rect.MakeXYWH(0, 160, 64, 64), fill)
+    canvas.restore()
+
+    surface.flushAndSubmit()
@@ -0,0 +1,83 @@
+import os
+from typing import Optional, Tuple
+
+import numpy as np
+import skia
+
+from .base import View
+from .offscreen import render_view, write_image
+
+# Golden images are written instead of compared when this environment variable is set.
+UPDATE_ENV = 'UPDATE_SNAPSHOTS'
+
+DIFF_COLOR = (255, 0, 0, 255)
+
+
+class SnapshotMismatch(AssertionError):
+    pass
+
+
+def read_png(path: str) -> np.ndarray:
+    image = skia.Image.open(path)
+    return image.toarray(colorType=skia.kRGBA_8888_ColorType, alphaType=skia.kPremul_AlphaType)
+
+
+def write_png(path: str, pixels: np.ndarray):
+    write_image(path, pixels, skia.kPNG)
+
+
+def compare(actual: np.ndarray, expected: np.ndarray, tolerance: int = 0) -> Optional[np.ndarray]:
+    """
+    Returns a mask of pixels where any channel differs by more than tolerance, or None when the
+    images match.
+    """
+    if actual.shape != expected.shape:
+        return np.ones(actual.shape[:2], dtype=bool)
+    # Comparing the larger minus the smaller avoids casting both images to a wider type.
+    mismatched = (np.maximum(actual, expected) - np.minimum(actual, expected) > tolerance).any(axis=2)
+    return mismatched if mismatched.any() else None
+
+
+def make_diff_image(actual: np.ndarray, mismatched: np.ndarray) -> np.ndarray:
+    """
+    Fades the actual image and marks mismatched pixels in red.
+    """
+    diff = actual // 4 + 191
+    diff[..., 3] = 255
+    diff[mismatched] = DIFF_COLOR
+    return diff
+
+
+def assert_snapshot(
+        view: View,
+        name: str,
+        size: Tuple[int, int] = (640, 480),
+        directory: str = 'snapshots',
+        tolerance: int = 2,
+        max_mismatched: int = 0,
+        scale: float = 1,
+):
+    """
+    Renders the view offscreen and compares it to the golden image <directory>/<name>.png. Up to
+    max_mismatched pixels may differ by more than tolerance. On failure <name>.diff.png and
+    <name>.actual.png are written next to the golden image.
+
+    Missing golden images are written, as are all of them when UPDATE_SNAPSHOTS is set.
+    """
+    actual = render_view(view, *size, scale=scale)
+    golden_path = os.path.join(directory, name + '.png')
+    if os.environ.get(UPDATE_ENV) or not os.path.exists(golden_path):
+        os.makedirs(directory, exist_ok=True)
+        write_png(golden_path, actual)
+        return
+
+    mismatched = compare(actual, read_png(golden_path), tolerance)
+    if mismatched is None:
+        return
+    mismatched_count = int(np.count_nonzero(mismatched))
+    if mismatched_count <= max_mismatched:
+        return
+
+    write_png(os.path.join(directory, name + '.actual.png'), actual)
+    write_png(os.path.join(directory, name + '.diff.png'), make_diff_image(actual, mismatched))
+    raise SnapshotMismatch(f'Snapshot "{name}" differs from the golden image in {mismatched_count} pixels.')
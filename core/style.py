@@ -0,0 +1,106 @@
+from collections import OrderedDict
+from typing import Dict, Tuple, Union
+
+from .color import Color
+
+# Properties a style may set, each applied through the fluent setter of the same name.
+COLOR_PROPERTIES = ('color', 'background')
+SPACING_PROPERTIES = ('margin', 'padding')
+NUMBER_PROPERTIES = ('radius', 'size', 'width', 'height', 'opacity')
+STYLE_PROPERTIES = COLOR_PROPERTIES + SPACING_PROPERTIES + NUMBER_PROPERTIES
+
+CACHE_SIZE = 1024
+
+# Keyed on the values of the properties, colors by their RGB value since Color objects hash by
+# identity. Bounded, styles compiled from changing values do not pile up.
+_STYLES: 'OrderedDict[tuple, Style]' = OrderedDict()
+
+
+def _compile_value(name: str, value):
+    if name not in STYLE_PROPERTIES:
+        raise ValueError(f'Unknown style property "{name}".')
+    if name in COLOR_PROPERTIES:
+        color = Color.parse(value) if isinstance(value, str) else value
+        # Creates the paint template once, instead of on the first draw.
+        color.as_paint()
+        return (color, )
+    if name in SPACING_PROPERTIES:
+        return tuple(value) if isinstance(value, (tuple, list)) else (value, )
+    return (value, )
+
+
+def _key_value(args: tuple) -> tuple:
+    return tuple(arg.as_skia_color() if isinstance(arg, Color) else arg for arg in args)
+
+
+class Style:
+    """
+    Immutable set of view properties compiled once: colors are parsed and have their paints
+    created, spacings are stored as the arguments of margin() and padding().
+
+    Styles are interned, compiling the same property values twice returns the same record, so
+    styles compiled inside body() are not created again on every rebuild.
+    """
+    __slots__ = ('__setters', )
+
+    def __init__(self, setters: Tuple[Tuple[str, tuple], ...]):
+        self.__setters = setters
+
+    @staticmethod
+    def compile(**properties) -> 'Style':
+        setters = tuple(sorted((name, _compile_value(name, value)) for name, value in properties.items()))
+        key = tuple((name, _key_value(args)) for name, args in setters)
+        style = _STYLES.get(key)
+        if style is None:
+            style = _STYLES[key] = Style(setters)
+            if len(_STYLES) > CACHE_SIZE:
+                _STYLES.popitem(last=False)
+        else:
+            _STYLES.move_to_end(key)
+        return style
+
+    def properties(self) -> dict:
+        return {name: args if name in SPACING_PROPERTIES else args[0] for name, args in self.__setters}
+
+    def extend(self, **properties) -> 'Style':
+        """
+        Returns the style with some properties added or replaced.
+        """
+        return Style.compile(**{**self.properties(), **properties})
+
+    def apply(self, view):
+        """
+        Sets the properties through the view's fluent setters, skipping the ones the view does
+        not have, e.g. the radius of a Text.
+        """
+        for name, args in self.__setters:
+            setter = getattr(view, name, None)
+            if setter is not None:
+                setter(*args)
+
+
+class StyleSheet:
+    """
+    Named styles compiled when the sheet is created:
+
+        theme = StyleSheet(button={'background': '#0000aa', 'radius': 4, 'margin': (12, 16)})
+        Rectangle().style(theme.button)
+    """
+
+    def __init__(self, **styles: Union[dict, Style]):
+        self.__styles: Dict[str, Style] = {
+            name: style if isinstance(style, Style) else Style.compile(**style)
+            for name, style in styles.items()
+        }
+
+    def __getattr__(self, name: str) -> Style:
+        try:
+            return self.__styles[name]
+        except KeyError:
+            raise AttributeError(f'Style sheet has no style "{name}".') from None
+
+    def __getitem__(self, name: str) -> Style:
+        return self.__styles[name]
+
+    def __contains__(self, name: str) -> bool:
+        return name in self.__styles
@@ -0,0 +1,105 @@
+from array import array
+from typing import Callable, Sequence, Optional
+
+
+class TextBuffer:
+    """
+    Gap buffer holding text along with the advance of every character.
+
+    Characters before the caret are stored in order, characters after it in reverse order, so
+    that typing, deleting and moving the caret only touch the end of one of the two halves.
+    Only inserted characters are measured, the caret offset and the total width are kept as
+    running sums.
+    """
+    __slots__ = (
+        '__measure', '__before', '__after', '__before_advances', '__after_advances',
+        '__before_width', '__after_width', '__text',
+    )
+
+    def __init__(self, text: str, measure: Callable[[str], Sequence[float]]):
+        self.__measure = measure
+        self.__text: Optional[str] = None
+        self.reset(text)
+
+    def reset(self, text: str, caret: int = None):
+        caret = len(text) if caret is None else max(0, min(caret, len(text)))
+        advances = self.__measure(text) if text else []
+        self.__before = list(text[:caret])
+        self.__after = list(reversed(text[caret:]))
+        self.__before_advances = array('d', advances[:caret])
+        self.__after_advances = array('d', reversed(advances[caret:]))
+        self.__before_width = sum(self.__before_advances)
+        self.__after_width = sum(self.__after_advances)
+        self.__text = text
+
+    def __len__(self):
+        return len(self.__before) + len(self.__after)
+
+    @property
+    def text(self) -> str:
+        if self.__text is None:
+            self.__text = ''.join(self.__before) + ''.join(reversed(self.__after))
+        return self.__text
+
+    @property
+    def caret(self) -> int:
+        return len(self.__before)
+
+    @property
+    def caret_offset(self) -> float:
+        return self.__before_width
+
+    @property
+    def width(self) -> float:
+        return self.__before_width + self.__after_width
+
+    def insert(self, text: str):
+        if not text:
+            return
+        advances = self.__measure(text)
+        self.__before.extend(text)
+        self.__before_advances.extend(advances)
+        self.__before_width += sum(advances)
+        self.__text = None
+
+    def delete_backward(self, count: int = 1):
+        count = min(count, len(self.__before))
+        for _ in range(count):
+            self.__before.pop()
+            self.__before_width -= self.__before_advances.pop()
+        if count:
+            self.__text = None
+        self.__discard_rounding_errors()
+
+    def delete_forward(self, count: int = 1):
+        count = min(count, len(self.__after))
+        for _ in range(count):
+            self.__after.pop()
+            self.__after_width -= self.__after_advances.pop()
+        if count:
+            self.__text = None
+        self.__discard_rounding_errors()
+
+    def move_caret(self, offset: int):
+        while offset > 0 and self.__after:
+            self.__before.append(self.__after.pop())
+            advance = self.__after_advances.pop()
+            self.__before_advances.append(advance)
+            self.__before_width += advance
+            self.__after_width -= advance
+            offset -= 1
+        while offset < 0 and self.__before:
+            self.__after.append(self.__before.pop())
+            advance = self.__before_advances.pop()
+            self.__after_advances.append(advance)
+            self.__after_width += advance
+            self.__before_width -= advance
+            offset += 1
+        self.__discard_rounding_errors()
+
+    def __discard_rounding_errors(self):
+        # Running sums drift slightly after many edits, an empty half is known to be exactly 0 wide.
+        if not self.__before:
+            self.__before_width = 0.0
+        if not self.__after:
+            self.__after_width = 0.0
@@ -0,0 +1,66 @@
+import threading
+import traceback
+from collections import deque
+from typing import Callable, Optional
+
+
+class UIThread:
+    """
+    The thread that owns the view tree: the main thread, or the UI-logic thread in pipelined
+    mode. Work posted from other threads is queued and run by it at the next frame boundary.
+    """
+
+    def __init__(self):
+        self.__thread_id: Optional[int] = None
+        self.__wake: Callable[[], None] = lambda: None
+        # Appending and popping from a deque are atomic, posting never takes a lock.
+        self.__tasks = deque()
+
+    def attach(self, wake: Callable[[], None]):
+        """
+        Makes the calling thread the UI thread, wake is called when work is posted.
+        """
+        self.__thread_id = threading.get_ident()
+        self.__wake = wake
+
+    def detach(self):
+        self.__thread_id = None
+        self.__wake = lambda: None
+
+    def is_current(self) -> bool:
+        # Before an app runs, any thread may touch views.
+        return self.__thread_id is None or self.__thread_id == threading.get_ident()
+
+    def post(self, task: Callable[[], None]):
+        self.__tasks.append(task)
+        self.__wake()
+
+    def run(self, task: Callable[[], None]):
+        """
+        Runs the task right away on the UI thread, posts it from any other thread.
+        """
+        if self.is_current():
+            task()
+        else:
+            self.post(task)
+
+    def drain(self) -> int:
+        """
+        Runs the tasks posted so far and returns how many ran. Tasks posted meanwhile wait for
+        the next frame, so a task posting itself again can't stall the frame. A failing task is
+        reported, the ones after it still run.
+        """
+        count = len(self.__tasks)
+        for _ in range(count):
+            task = self.__tasks.popleft()
+            try:
+                task()
+            except Exception:
+                traceback.print_exc()
+        return count
+
+    def __len__(self):
+        return len(self.__tasks)
+
+
+UI_THREAD = UIThread()
@@ -0,0 +1,171 @@
+import os
+import sys
+import json
+import time
+import argparse
+import importlib
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from typing import Iterable, Iterator, Optional, Tuple
+
+import skia
+
+from core.base import View
+from core.fonts import get_font
+from core.offscreen import render_view, write_image
+
+FORMATS = {
+    'png': skia.kPNG,
+    'webp': skia.kWEBP,
+}
+# Font sizes used by the views by default, created in every worker before its first record.
+WARM_FONT_SIZES = (14, 16)
+
+# Set in every worker process by _init_worker().
+_view_class: Optional[type] = None
+
+
+def create_view(view_class: type, record: dict) -> View:
+    """
+    Records are props passed to the view, or dicts with "props" and "state", the State values
+    set on the view after it is created, and optionally the "name" of the image.
+    """
+    if not _is_structured(record):
+        return view_class(**record)
+    view = view_class(**record.get('props', {}))
+    for name, value in record.get('state', {}).items():
+        setattr(view, name, value)
+    return view
+
+
+def _is_structured(record: dict) -> bool:
+    return 'props' in record or 'state' in record
+
+
+def _init_worker(module_name: str, view_name: str):
+    global _view_class
+    _view_class = getattr(importlib.import_module(module_name), view_name)
+    for font_size in WARM_FONT_SIZES:
+        get_font(font_size)
+        get_font(font_size, subpixel=True)
+
+
+def _export_record(record: dict, path: str, size: Tuple[int, int], scale: float, image_format: str,
+                   quality: int) -> str:
+    pixels = render_view(create_view(_view_class, record), *size, scale=scale)
+    write_image(path, pixels, FORMATS[image_format], quality)
+    return path
+
+
+def export_views(
+        module_name: str,
+        view_name: str,
+        records: Iterable[dict],
+        out_dir: str,
+        size: Tuple[int, int] = (640, 480),
+        scale: float = 1,
+        image_format: str = 'png',
+        quality: int = 90,
+        workers: int = None,
+) -> Iterator[str]:
+    """
+    Renders the view once per record across a process pool and yields the paths of the written
+    images in the order of the records. Records are read lazily and only a few per worker are in
+    flight, so any number of them can be streamed.
+
+    Images are named after the "name" of structured records, or the index of the record. Names
+    must be unique and can't contain path separators, ValueError is raised at the first record
+    breaking that.
+    """
+    if image_format not in FORMATS:
+        raise ValueError(f'Unknown image format "{image_format}", expected one of {", ".join(FORMATS)}.')
+    os.makedirs(out_dir, exist_ok=True)
+    records = iter(records)
+    first_record = next(records, None)
+    if first_record is None:
+        return
+
+    workers = workers or os.cpu_count()
+    with ProcessPoolExecutor(
+            workers,
+            initializer=_init_worker,
+            initargs=(module_name, view_name),
+    ) as executor:
+        pending = deque()
+        names = set()
+        index = 0
+        for record in _chain(first_record, records):
+            name = _get_image_name(record, index)
+            if name in names:
+                raise ValueError(f'Record {index} is named "{name}" like an earlier one.')
+            names.add(name)
+            path = os.path.join(out_dir, f'{name}.{image_format}')
+            pending.append(executor.submit(_export_record, record, path, size, scale, image_format, quality))
+            index += 1
+            # Only a few records per worker are kept in flight.
+            if len(pending) >= workers * 4:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
+
+
+def _get_image_name(record: dict, index: int) -> str:
+    name = f'{index:06d}'
+    if not _is_structured(record) or 'name' not in record:
+        return name
+    name = str(record['name'])
+    separators = {'/', os.sep, os.altsep} - {None}
+    if name in ('', '.', '..') or any(separator in name for separator in separators):
+        raise ValueError(f'Record {index} is named "{name}", names must be file names within the output directory.')
+    return name
+
+
+def _chain(first, rest: Iterator) -> Iterator:
+    yield first
+    yield from rest
+
+
+def _read_records(filename: str) -> Iterator[dict]:
+    file = sys.stdin if filename == '-' else open(filename)
+    try:
+        for line in file:
+            if line.strip():
+                yield json.loads(line)
+    finally:
+        if file is not sys.stdin:
+            file.close()
+
+
+def _parse_size(size: str) -> Tuple[int, int]:
+    width, height = size.lower().split('x')
+    return int(width), int(height)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Skooter Batch Export')
+    parser.add_argument('module')
+    parser.add_argument('view')
+    parser.add_argument('records', help='JSON lines file of records, - for stdin')
+    parser.add_argument('--out', default='export')
+    parser.add_argument('--size', type=_parse_size, default=(640, 480), help='e.g. 640x480')
+    parser.add_argument('--scale', type=float, default=1)
+    parser.add_argument('--format', choices=FORMATS, default='png')
+    parser.add_argument('--quality', type=int, default=90)
+    parser.add_argument('--workers', type=int)
+    arguments: argparse.Namespace = parser.parse_args()
+
+    start_time = time.time()
+    count = 0
+    for _ in export_views(
+            arguments.module,
+            arguments.view,
+            _read_records(arguments.records),
+            arguments.out,
+            size=arguments.size,
+            scale=arguments.scale,
+            image_format=arguments.format,
+            quality=arguments.quality,
+            workers=arguments.workers,
+    ):
+        count += 1
+    print(f'Exported {count} images to {arguments.out} in {round(time.time() - start_time, 2)} s')
@@ -1,43 +1,312 @@
 import os
+import sys
+import select
+import struct
+import ctypes
+import ctypes.util
+import inspect
 import argparse
 import importlib
 import time
 import threading
 import datetime
+from types import ModuleType
+from typing import Dict, List, Iterable, Set
 
 from core.app import App
 
+# Modules of the framework itself are never reloaded: live views and the App keep references
+# to their classes and globals.
+NON_RELOADABLE_PACKAGES = ('core', )
+
+DEBOUNCE_INTERVAL = 0.02
+POLL_INTERVAL = 0.25
+
+
+def get_project_root(module: ModuleType) -> str:
+    path = os.path.dirname(os.path.abspath(module.__file__))
+    if hasattr(module, '__path__'):
+        path = os.path.dirname(path)
+    for _ in range(module.__name__.count('.')):
+        path = os.path.dirname(path)
+    return path
+
+
+def is_reloadable(module: ModuleType, project_root: str) -> bool:
+    filename = getattr(module, '__file__', None)
+    if not filename or not filename.endswith('.py'):
+        return False
+    if module.__name__ in ('__main__', __name__):
+        return False
+    if module.__name__.split('.')[0] in NON_RELOADABLE_PACKAGES:
+        return False
+    return os.path.abspath(filename).startswith(project_root + os.sep)
+
+
+def get_direct_dependencies(module: ModuleType, candidates: Dict[str, ModuleType]) -> Set[str]:
+    dependencies = set()
+    for value in list(vars(module).values()):
+        if isinstance(value, ModuleType):
+            name = value.__name__
+        else:
+            name = getattr(value, '__module__', None)
+        if name in candidates and name != module.__name__:
+            dependencies.add(name)
+    return dependencies
+
+
+class DependencyGraph:
+    """
+    Project modules reachable from the root module, along with the modules each of them uses.
+    """
+
+    def __init__(self, root_module: ModuleType):
+        self.root_module = root_module
+        self.project_root = get_project_root(root_module)
+        self.modules: Dict[str, ModuleType] = {}
+        self.dependencies: Dict[str, Set[str]] = {}
+        self.rebuild()
+
+    def rebuild(self):
+        candidates = {
+            name: module
+            for name, module in list(sys.modules.items())
+            if module is not None and is_reloadable(module, self.project_root)
+        }
+        candidates[self.root_module.__name__] = self.root_module
+
+        self.modules = {}
+        self.dependencies = {}
+        pending = [self.root_module.__name__]
+        while pending:
+            name = pending.pop()
+            if name in self.modules:
+                continue
+            module = candidates[name]
+            self.modules[name] = module
+            self.dependencies[name] = get_direct_dependencies(module, candidates)
+            pending.extend(self.dependencies[name])
+
+    @property
+    def filenames(self) -> List[str]:
+        return [os.path.abspath(module.__file__) for module in self.modules.values()]
+
+    def modules_for_files(self, filenames: Iterable[str]) -> Set[str]:
+        filenames = set(filenames)
+        return {
+            name
+            for name, module in self.modules.items()
+            if os.path.abspath(module.__file__) in filenames
+        }
+
+    def reload_order(self, changed: Set[str]) -> List[str]:
+        """
+        Returns changed modules along with every module depending on them, dependencies first.
+        """
+        affected = set(changed)
+        grew = True
+        while grew:
+            grew = False
+            for name, dependencies in self.dependencies.items():
+                if name not in affected and dependencies & affected:
+                    affected.add(name)
+                    grew = True
+
+        order = []
+        visited = set()
+
+        def visit(module_name):
+            if module_name in visited:
+                return
+            visited.add(module_name)
+            for dependency in sorted(self.dependencies[module_name]):
+                visit(dependency)
+            if module_name in affected:
+                order.append(module_name)
+
+        for name in sorted(affected):
+            visit(name)
+        return order
+
 
 class FileChangeHandler:
     def __init__(self, app: App, module_name, view_name):
         self.app = app
         self.module_name = module_name
         self.view_name = view_name
+        self.graph = DependencyGraph(importlib.import_module(module_name))
+        self.view_source = self.__get_view_source()
 
-    def dispatch(self, event):
+    def __get_view_source(self) -> str:
+        view_class = getattr(self.graph.root_module, self.view_name)
+        try:
+            return inspect.getsource(view_class)
+        except (OSError, TypeError):
+            return ''
+
+    @property
+    def filenames(self) -> List[str]:
+        return self.graph.filenames
+
+    def dispatch(self, changed_files: Set[str]):
+        """
+        Reloads the modules of the changed files on the UI thread, between two frames, so that the
+        view tree is never drawn or rebuilt while the modules it uses are half reloaded. Blocks
+        until the reload is done.
+        """
+        reloaded = threading.Event()
+
+        def reload():
+            try:
+                self.__reload(changed_files)
+            finally:
+                reloaded.set()
+
+        self.app.post(reload)
+        reloaded.wait()
+
+    def __reload(self, changed_files: Set[str]):
         current_time = datetime.datetime.now().time()
-        print(f'[{current_time}] Reloading...')
-        module = importlib.import_module(self.module_name)
-        view_class = getattr(module, self.view_name)
-        self.app.root_view = view_class()
-        # self.app.draw()
+        changed_modules = self.graph.modules_for_files(changed_files)
+        if not changed_modules:
+            return
+        start_time = time.time()
+        reload_order = self.graph.reload_order(changed_modules)
+        print(f'[{current_time}] Reloading {", ".join(reload_order)}...')
+
+        try:
+            for name in reload_order:
+                importlib.reload(self.graph.modules[name])
+            view_class = getattr(self.graph.root_module, self.view_name)
+            view = view_class()
+        except Exception as error:
+            print(f'[{current_time}] Reload failed: {error!r}')
+            return
+        finally:
+            self.graph.rebuild()
+
+        view_source = self.__get_view_source()
+        keep_state = view_source == self.view_source
+        self.view_source = view_source
+        self.app.replace_root_view(view, keep_state=keep_state)
+        print(f'[{current_time}] Reloaded in {round((time.time() - start_time) * 1000, 2)} ms')
 
 
 class FileWatcher(threading.Thread):
-    def __init__(self, filename: str, handler: FileChangeHandler):
-        super().__init__()
-        self.filename = filename
-        self.last_modified = os.stat(self.filename).st_mtime
+    """
+    Polls the modification time of the files, used where inotify is not available.
+    """
+
+    def __init__(self, handler: FileChangeHandler):
+        super().__init__(daemon=True)
         self.handler = handler
         self.stop = False
+        self.last_modified: Dict[str, float] = {}
+        self.watch(handler.filenames)
+
+    def watch(self, filenames: Iterable[str]):
+        self.last_modified = {
+            filename: self.last_modified.get(filename) or os.stat(filename).st_mtime
+            for filename in filenames
+        }
+
+    def dispatch(self, changed_files: Set[str]):
+        self.handler.dispatch(changed_files)
+        # Reloaded modules may import other project modules.
+        self.watch(self.handler.filenames)
 
     def run(self):
         while not self.stop:
-            last_modified = os.stat(self.filename).st_mtime
-            if last_modified > self.last_modified:
-                self.last_modified = last_modified
-                self.handler.dispatch(last_modified)
-            time.sleep(1)
+            changed_files = set()
+            for filename, last_modified in list(self.last_modified.items()):
+                try:
+                    modified = os.stat(filename).st_mtime
+                except FileNotFoundError:
+                    continue
+                if modified > last_modified:
+                    self.last_modified[filename] = modified
+                    changed_files.add(filename)
+            if changed_files:
+                self.dispatch(changed_files)
+            time.sleep(POLL_INTERVAL)
+
+
+class InotifyFileWatcher(FileWatcher):
+    """
+    Watches directories containing the files, so that editors replacing files on save are noticed too.
+    """
+    IN_CLOSE_WRITE = 0x00000008
+    IN_MOVED_TO = 0x00000080
+    IN_CREATE = 0x00000100
+    IN_NONBLOCK = 0o4000
+    IN_CLOEXEC = 0o2000000
+    EVENT_HEADER = struct.Struct('iIII')
+
+    def __init__(self, handler: FileChangeHandler, libc: ctypes.CDLL):
+        # Set before the base class watches the files of the handler.
+        self.libc = libc
+        self.fd = libc.inotify_init1(self.IN_NONBLOCK | self.IN_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), 'inotify_init1() failed')
+        self.directories: Dict[int, str] = {}
+        self.filenames: Set[str] = set()
+        super().__init__(handler)
+
+    @classmethod
+    def create(cls, handler: FileChangeHandler) -> FileWatcher:
+        library = ctypes.util.find_library('c')
+        if not sys.platform.startswith('linux') or library is None:
+            return FileWatcher(handler)
+        try:
+            return cls(handler, ctypes.CDLL(library, use_errno=True))
+        except (OSError, AttributeError):
+            return FileWatcher(handler)
+
+    def watch(self, filenames: Iterable[str]):
+        self.filenames = set(filenames)
+        watched_directories = set(self.directories.values())
+        mask = self.IN_CLOSE_WRITE | self.IN_MOVED_TO | self.IN_CREATE
+        for directory in {os.path.dirname(filename) for filename in self.filenames} - watched_directories:
+            descriptor = self.libc.inotify_add_watch(self.fd, directory.encode(), mask)
+            if descriptor < 0:
+                raise OSError(ctypes.get_errno(), f'inotify_add_watch() failed for {directory}')
+            self.directories[descriptor] = directory
+
+    def read_events(self) -> Set[str]:
+        changed_files = set()
+        try:
+            data = os.read(self.fd, 64 * 1024)
+        except BlockingIOError:
+            return changed_files
+
+        offset = 0
+        while offset < len(data):
+            descriptor, mask, cookie, length = self.EVENT_HEADER.unpack_from(data, offset)
+            offset += self.EVENT_HEADER.size
+            name = data[offset:offset + length].rstrip(b'\0').decode()
+            offset += length
+            directory = self.directories.get(descriptor)
+            if directory is None:
+                continue
+            filename = os.path.join(directory, name)
+            if filename in self.filenames:
+                changed_files.add(filename)
+        return changed_files
+
+    def run(self):
+        try:
+            while not self.stop:
+                readable, _, _ = select.select([self.fd], [], [], POLL_INTERVAL)
+                if not readable:
+                    continue
+                changed_files = self.read_events()
+                # Editors usually emit a burst of events per save, collect them into a single reload.
+                while select.select([self.fd], [], [], DEBOUNCE_INTERVAL)[0]:
+                    changed_files |= self.read_events()
+                if changed_files:
+                    self.dispatch(changed_files)
+        finally:
+            os.close(self.fd)
 
 
 def launch_preview(module_name, view_name):
@@ -48,9 +317,9 @@ def launch_preview(module_name, view_name):
 
     file_change_handler = FileChangeHandler(app, module_name, view_name)
 
-    file_watcher = FileWatcher(module.__file__, file_change_handler)
+    file_watcher = InotifyFileWatcher.create(file_change_handler)
     file_watcher.start()
-    print(f'Watching updates on {module.__file__}')
+    print(f'Watching updates on {", ".join(file_change_handler.filenames)}')
 
     app.execute()
     file_watcher.stop = True
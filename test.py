@@ -5,7 +5,7 @@ from core.app import App
 from core.color import Color
 from core.data import State, ContextProperty
 from core.key_input import KeyInput, KeyListener
-from views import Rectangle, Text, Image, Flex, Input
+from views import Rectangle, Text, Image, Flex, Input, Grid
 from views.enums import Justify, Alignment
 from core.base import View
 
@@ -75,16 +75,11 @@ class RequestInfo(View):
                 input_row.grow(url_field, 1)
                 Button('Send')
 
-            with Flex().vertical().background(Color('#eee')):
+            with Grid(columns=('1fr', 1, '2fr')).background(Color('#eee')):
                 for key, value in self.query_params:
-                    with Flex() as query_params_row:
-                        key_text = Text(key).margin(12)
-                        query_params_row.grow(key_text, 1)
-
-                        Rectangle(1, 30).background(Color('#999'))
-
-                        value_text = Text(value).margin(12)
-                        query_params_row.grow(value_text, 2)
+                    Text(key).margin(12)
+                    Rectangle(1, 30).background(Color('#999'))
+                    Text(value).margin(12)
 
         return root
 
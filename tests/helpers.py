@@ -0,0 +1,12 @@
+import numpy
+import skia
+
+
+def make_image(width: int, height: int, color: int) -> skia.Image:
+    surface = skia.Surface(width, height)
+    surface.getCanvas().clear(color)
+    return surface.makeImageSnapshot()
+
+
+def read_pixels(surface: skia.Surface) -> numpy.ndarray:
+    return surface.toarray(colorType=skia.kRGBA_8888_ColorType)
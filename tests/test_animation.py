@@ -0,0 +1,65 @@
+import time
+
+import pytest
+import skia
+
+from core.animation import Animator, linear
+from core.color import Color
+from core.frame_scheduler import FrameScheduler
+from views.flex import Flex
+from views.rectangle import Rectangle
+from views.text import Text
+
+
+def run_frames(scheduler: FrameScheduler, seconds: float):
+    now = time.perf_counter()
+    end = now + seconds
+    while now < end:
+        now += 1 / 60
+        scheduler.run_due(now)
+
+
+@pytest.fixture
+def scheduler():
+    return FrameScheduler(target_fps=None)
+
+
+def test_color_animates_from_current_value(scheduler):
+    text = Text('Hello').color(Color.black())
+    Animator(scheduler).tween(text, 'color', Color.white(), duration=0.1, easing=linear)
+    run_frames(scheduler, 0.2)
+    assert text.current_color.as_skia_color() == skia.ColorWHITE
+
+
+def test_background_animates_from_current_value(scheduler):
+    rectangle = Rectangle(10, 10).background(Color.red())
+    animator = Animator(scheduler)
+    animator.tween(rectangle, 'background', Color.blue(), duration=0.1, easing=linear)
+    run_frames(scheduler, 0.05)
+    assert rectangle.current_background.as_skia_color() not in (skia.ColorRED, skia.ColorBLUE)
+    run_frames(scheduler, 0.2)
+    assert rectangle.current_background.as_skia_color() == skia.ColorBLUE
+    assert not animator.active
+
+
+def test_unset_value_needs_a_start(scheduler):
+    animator = Animator(scheduler)
+    with pytest.raises(ValueError):
+        animator.tween(Flex(), 'background', Color.blue())
+    animator.tween(Flex(), 'background', Color.blue(), start=Color.white())
+    # Views without a color at all.
+    with pytest.raises(ValueError):
+        animator.tween(Rectangle(10, 10), 'color', Color.blue())
+
+
+def test_private_background_is_the_start_value(scheduler):
+    text = Text('Hello').background(Color.red())
+    tween = Animator(scheduler).tween(text, 'background', Color.blue())
+    assert tween.start is text.current_background
+
+
+def test_spring_settles_at_target(scheduler):
+    rectangle = Rectangle(10, 10)
+    Animator(scheduler).spring(rectangle, 'width', 50)
+    run_frames(scheduler, 2)
+    assert rectangle._width == 50
@@ -0,0 +1,61 @@
+import threading
+
+import pytest
+
+from core.app import App
+from core.base import View
+from core.ui_thread import UI_THREAD
+from views.rectangle import Rectangle
+
+
+@pytest.fixture
+def app():
+    # App is a singleton, the test runs it headless and detaches it from the test thread after.
+    app = App(View())
+    app.start_headless(64, 64)
+    app.replace_root_view(Rectangle(10, 10))
+    app.frame_stats.reset()
+    yield app
+    UI_THREAD.drain()
+    UI_THREAD.detach()
+    app.surface = None
+
+
+def test_tasks_posted_from_threads_run_before_the_frame(app):
+    ran = []
+    threads = [threading.Thread(target=lambda: app.post(lambda: ran.append(1))) for _ in range(3)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert ran == []
+
+    app.run_frame()
+    assert ran == [1, 1, 1]
+    assert list(app.frame_stats.queue_depths) == [3]
+    summary = app.frame_stats.summary()
+    assert summary['max_queue_depth'] == 3
+    assert summary['drain_ms']['max'] >= 0
+
+    # Frames without posted tasks record no drain.
+    app.run_frame()
+    assert list(app.frame_stats.queue_depths) == [3]
+
+
+def test_failing_task_is_reported(app, capsys):
+    ran = []
+
+    def fail():
+        raise RuntimeError('task failed')
+
+    app.post(fail)
+    app.post(lambda: ran.append(1))
+    app.run_frame()
+    assert ran == [1]
+    assert 'task failed' in capsys.readouterr().err
+    assert len(UI_THREAD) == 0
+
+    # The frame loop keeps draining.
+    app.post(lambda: ran.append(2))
+    app.run_frame()
+    assert ran == [1, 2]
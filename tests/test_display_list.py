@@ -0,0 +1,50 @@
+import skia
+
+from core.atlas import ImageAtlas
+from core.display_list import DisplayList, RecordingCanvas, DRAW_IMAGE_RECT
+
+from tests.helpers import make_image, read_pixels
+
+
+def record_sprites(atlas: ImageAtlas, keys) -> DisplayList:
+    canvas = RecordingCanvas(64, 16)
+    for index, key in enumerate(keys):
+        entry = atlas.get(key)
+        canvas.drawImageRect(entry.page.image, entry.src, skia.Rect.MakeXYWH(index * 16, 0, 8, 8))
+    return canvas.finish()
+
+
+def test_replay_batches_sprites_of_one_page():
+    atlas = ImageAtlas(page_size=64)
+    colors = {'red': skia.ColorRED, 'green': skia.ColorGREEN, 'blue': skia.ColorBLUE}
+    for key, color in colors.items():
+        atlas.add(key, make_image(8, 8, color))
+    assert len(atlas.pages) == 1
+
+    display_list = record_sprites(atlas, list(colors))
+    assert list(display_list.ops) == [DRAW_IMAGE_RECT] * 3
+
+    surface = skia.Surface(64, 16)
+    surface.getCanvas().clear(skia.ColorWHITE)
+    display_list.replay(surface.getCanvas())
+
+    pixels = read_pixels(surface)
+    assert list(pixels[4, 4]) == [255, 0, 0, 255]
+    assert list(pixels[4, 20]) == [0, 255, 0, 255]
+    assert list(pixels[4, 36]) == [0, 0, 255, 255]
+    # Between the sprites, nothing is drawn.
+    assert list(pixels[4, 12]) == [255, 255, 255, 255]
+    assert list(pixels[12, 4]) == [255, 255, 255, 255]
+
+
+def test_replay_single_sprite():
+    atlas = ImageAtlas(page_size=64)
+    atlas.add('red', make_image(8, 8, skia.ColorRED))
+
+    surface = skia.Surface(64, 16)
+    surface.getCanvas().clear(skia.ColorWHITE)
+    record_sprites(atlas, ['red']).replay(surface.getCanvas())
+
+    pixels = read_pixels(surface)
+    assert list(pixels[4, 4]) == [255, 0, 0, 255]
+    assert list(pixels[4, 12]) == [255, 255, 255, 255]
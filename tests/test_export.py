@@ -0,0 +1,88 @@
+import json
+import os
+import subprocess
+import sys
+
+import pytest
+import skia
+
+from core.base import View
+from core.color import Color
+from export import export_views
+from views.rectangle import Rectangle
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+class Swatch(View):
+    # Exported by the worker processes, which import this module by name.
+    def __init__(self, color: str):
+        super().__init__()
+        self.color = color
+
+    def body(self):
+        return Rectangle(16, 16).background(Color(self.color))
+
+
+def read_image(path: str):
+    image = skia.Image.open(path)
+    return image.toarray(colorType=skia.kRGBA_8888_ColorType)
+
+
+def test_export_writes_decodable_images(tmp_path):
+    records = [{'color': '#ff0000'}, {'props': {'color': '#0000ff'}, 'name': 'blue'}]
+    paths = list(export_views(__name__, 'Swatch', records, str(tmp_path), size=(32, 24), workers=1))
+
+    assert paths == [str(tmp_path / '000000.png'), str(tmp_path / 'blue.png')]
+    red = read_image(paths[0])
+    assert red.shape == (24, 32, 4)
+    assert list(red[4, 4]) == [255, 0, 0, 255]
+    assert list(read_image(paths[1])[4, 4]) == [0, 0, 255, 255]
+
+
+@pytest.mark.parametrize('name', ['../escaped', 'nested/name', '..', ''])
+def test_export_rejects_names_outside_of_out_dir(tmp_path, name):
+    out = tmp_path / 'out'
+    records = [{'props': {'color': '#ff0000'}, 'name': name}]
+    with pytest.raises(ValueError):
+        list(export_views(__name__, 'Swatch', records, str(out), size=(32, 24), workers=1))
+    assert list(tmp_path.iterdir()) == [out]
+    assert list(out.iterdir()) == []
+
+
+def test_export_rejects_duplicate_names(tmp_path):
+    records = [
+        {'props': {'color': '#ff0000'}, 'name': 'swatch'},
+        {'props': {'color': '#0000ff'}, 'name': 'swatch'},
+    ]
+    with pytest.raises(ValueError):
+        list(export_views(__name__, 'Swatch', records, str(tmp_path), size=(32, 24), workers=1))
+    # The first image is not overwritten.
+    assert list(read_image(str(tmp_path / 'swatch.png'))[4, 4]) == [255, 0, 0, 255]
+
+    # Names may also collide with the index of an unnamed record.
+    records = [{'color': '#ff0000'}, {'props': {'color': '#0000ff'}, 'name': '000000'}]
+    with pytest.raises(ValueError):
+        list(export_views(__name__, 'Swatch', records, str(tmp_path), size=(32, 24), workers=1))
+
+
+def test_export_webp(tmp_path):
+    paths = list(export_views(__name__, 'Swatch', [{'color': '#00ff00'}], str(tmp_path), size=(32, 24),
+                              image_format='webp', workers=1))
+    assert paths[0].endswith('.webp')
+    green = read_image(paths[0])
+    assert green[4, 4][1] > 240 and green[4, 4][0] < 16
+
+
+def test_cli(tmp_path):
+    records = tmp_path / 'records.jsonl'
+    records.write_text(json.dumps({'color': '#000000'}) + '\n')
+    out = tmp_path / 'out'
+    subprocess.run(
+        [sys.executable, 'export.py', __name__, 'Swatch', str(records), '--out', str(out), '--size', '32x24',
+         '--workers', '1'],
+        cwd=ROOT,
+        check=True,
+        capture_output=True,
+    )
+    assert list(read_image(str(out / '000000.png'))[4, 4]) == [0, 0, 0, 255]
@@ -0,0 +1,38 @@
+from core.color import Color
+from core.offscreen import render_view
+from views.enums import Overflow
+from views.flex import Flex
+from views.rectangle import Rectangle
+
+BLACK = [0, 0, 0, 255]
+WHITE = [255, 255, 255, 255]
+
+
+def make_overflowing_flex(overflow: str) -> Flex:
+    with Flex().vertical().height(20).overflow(overflow) as flex:
+        Rectangle(32, 60).background(Color.black())
+    return flex
+
+
+def test_overflow_clip_clips_to_height():
+    pixels = render_view(make_overflowing_flex(Overflow.CLIP), 64, 100)
+    assert list(pixels[10, 10]) == BLACK
+    assert list(pixels[40, 10]) == WHITE
+
+
+def test_overflow_visible_draws_overflowing_children():
+    pixels = render_view(make_overflowing_flex(Overflow.VISIBLE), 64, 100)
+    assert list(pixels[40, 10]) == BLACK
+
+
+def test_clipped_flex_in_parent():
+    with Flex().vertical() as root:
+        make_overflowing_flex(Overflow.HIDDEN)
+        Rectangle(32, 10).background(Color.red())
+    assert make_overflowing_flex(Overflow.HIDDEN).get_bounding_rect().height == 20
+
+    pixels = render_view(root, 64, 100)
+    assert list(pixels[10, 10]) == BLACK
+    # The sibling follows the clipped box, not the overflowing content.
+    assert list(pixels[25, 10]) == [255, 0, 0, 255]
+    assert list(pixels[40, 10]) == WHITE
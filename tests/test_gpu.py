@@ -0,0 +1,46 @@
+import pytest
+import skia
+
+from core.app import App
+from core.base import View
+
+
+@pytest.fixture
+def app():
+    # App is a singleton, the test gives it a mock GPU context and takes it back.
+    app = App(View())
+    app.context = skia.GrDirectContext.MakeMock(None)
+    yield app
+    app.context = None
+
+
+def draw_offscreen(context: skia.GrDirectContext):
+    surface = skia.Surface.MakeRenderTarget(context, skia.Budgeted.kYes, skia.ImageInfo.MakeN32Premul(256, 256))
+    surface.getCanvas().clear(skia.ColorRED)
+    surface.flushAndSubmit()
+
+
+def test_gpu_stats(app):
+    app.context.setResourceCacheLimit(1 << 20)
+    draw_offscreen(app.context)
+
+    stats = app.gpu_stats()
+    assert stats['cache_limit'] == 1 << 20
+    assert stats['purgeable_bytes'] >= 256 * 256 * 4
+    assert stats['max_texture_size'] > 0
+
+
+def test_gpu_stats_without_context(app):
+    app.context = None
+    assert app.gpu_stats() == {}
+
+
+def test_purge_keeps_recently_used_resources(app):
+    draw_offscreen(app.context)
+    purgeable_bytes = app.context.getResourceCachePurgeableBytes()
+
+    app.purge_gpu_resources(not_used_for=60)
+    assert app.context.getResourceCachePurgeableBytes() == purgeable_bytes
+
+    app.purge_gpu_resources()
+    assert app.context.getResourceCachePurgeableBytes() == 0
@@ -0,0 +1,84 @@
+import math
+
+import pytest
+
+from core.color import Color
+from core.offscreen import render_view
+from views.grid import Grid, Track, solve_tracks, FIXED, FRACTION, AUTO
+from views.rectangle import Rectangle
+
+BLACK = [0, 0, 0, 255]
+RED = [255, 0, 0, 255]
+WHITE = [255, 255, 255, 255]
+
+
+def get_rects(grid: Grid, width: float = math.inf, height: float = math.inf):
+    return [
+        (item.x, item.y, item.width, item.height)
+        for item in grid._get_layout(width, height).items
+    ]
+
+
+def test_track_parse():
+    assert (Track.parse(20).kind, Track.parse(20).value) == (FIXED, 20)
+    assert (Track.parse('12px').kind, Track.parse('12px').value) == (FIXED, 12)
+    assert (Track.parse('auto').kind, Track.parse('auto').value) == (AUTO, 0)
+    assert (Track.parse('fr').kind, Track.parse('fr').value) == (FRACTION, 1)
+    assert (Track.parse('2fr').kind, Track.parse('2fr').value) == (FRACTION, 2)
+    track = Track(FIXED, 5)
+    assert Track.parse(track) is track
+    with pytest.raises(ValueError):
+        Track.parse('wide')
+
+
+def test_solve_tracks():
+    tracks = [Track(FIXED, 10), Track(AUTO), Track(FRACTION, 1), Track(FRACTION, 3)]
+    # 100 - 10 - 6 - 3 gaps of 2 leave 78 for the fractions.
+    assert solve_tracks(tracks, [0, 6, 50, 50], 100, 2) == [10, 6, 19.5, 58.5]
+    # Unbounded fractions size to their content.
+    assert solve_tracks(tracks, [0, 6, 50, 40], math.inf, 2) == [10, 6, 50, 40]
+    # Fractions never go below zero.
+    assert solve_tracks(tracks, [0, 200, 0, 0], 100, 0) == [10, 200, 0, 0]
+
+
+def test_fixed_and_auto_columns():
+    with Grid(columns=(20, AUTO)) as grid:
+        Rectangle(5, 10)
+        Rectangle(30, 5)
+        Rectangle(5, 15)
+        Rectangle(12, 5)
+    assert get_rects(grid) == [
+        (0, 0, 20, 10), (20, 0, 30, 10),
+        (0, 10, 20, 15), (20, 10, 30, 15),
+    ]
+    rect = grid.get_bounding_rect()
+    assert (rect.width, rect.height) == (50, 25)
+
+
+def test_fraction_columns_and_gaps():
+    with Grid(columns=('fr', '3fr')).rows(8).gap(4, 2) as grid:
+        Rectangle(1, 5)
+        Rectangle(1, 5)
+        Rectangle(1, 20)
+    # 84 - 4 of gap leave 80 for the fractions, rows past the defined ones size to their content.
+    assert get_rects(grid, 84, math.inf) == [
+        (0, 0, 20, 8), (24, 0, 60, 8),
+        (0, 10, 20, 20),
+    ]
+
+
+def test_grid_is_drawn_into_cells():
+    with Grid(columns=(10, 10)).gap(4) as grid:
+        Rectangle(10, 10).background(Color.black())
+        Rectangle(10, 10).background(Color.red())
+    pixels = render_view(grid, 32, 16)
+    assert list(pixels[5, 5]) == BLACK
+    assert list(pixels[5, 12]) == WHITE
+    assert list(pixels[5, 19]) == RED
+
+
+def test_grid_needs_a_column():
+    with pytest.raises(ValueError):
+        Grid(columns=())
+    with pytest.raises(ValueError):
+        Grid().columns()
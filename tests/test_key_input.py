@@ -0,0 +1,78 @@
+import gc
+
+from core.base import View
+from core.data import State
+from core.key_input import KeyInput, Keys, KeyListener
+from core.offscreen import record_view
+from views.flex import Flex
+from views.input import Input
+
+
+class Form(View):
+    name = State('')
+    email = State('')
+
+    def body(self):
+        with Flex().vertical() as root:
+            Input(self.binding('name'))
+            Input(self.binding('email'))
+        return root
+
+
+def get_inputs(form: Form):
+    return [view for view in form.get_children()[0].get_children() if isinstance(view, Input)]
+
+
+def press_tab(key_input: KeyInput):
+    key_input.key_callback(None, Keys.TAB, 0, 1, 0)
+
+
+def test_rebuilt_inputs_keep_focus_and_tab_order():
+    key_input = KeyInput()
+    form = Form().context(key_input)
+    record_view(form, 200, 100)
+    key_input.focus(get_inputs(form)[0])
+
+    for rebuild in range(4):
+        # Typing rebuilds the form, the collector runs between frames.
+        form.name = 'x' * (rebuild + 1)
+        record_view(form, 200, 100)
+        gc.collect()
+        name_input, email_input = get_inputs(form)
+        assert key_input.focused_view is name_input
+        assert key_input.is_focusable(email_input)
+
+    press_tab(key_input)
+    assert key_input.focused_view is get_inputs(form)[1]
+    press_tab(key_input)
+    assert key_input.focused_view is get_inputs(form)[0]
+
+
+class Field(View, KeyListener):
+    def __init__(self, key):
+        super(Field, self).__init__()
+        self.__key = key
+        KeyInput().add_listener(self)
+
+    def focus_key(self):
+        return self.__key
+
+
+def test_collected_predecessors_are_skipped():
+    key_input = KeyInput()
+    field = Field('collected-field')
+    neighbour = Field('collected-neighbour')
+    key_input.focus(field)
+
+    for _ in range(3):
+        # The previous field is gone before its successor registers.
+        del field
+        gc.collect()
+        field = Field('collected-field')
+        assert key_input.focused_view is field
+        assert key_input.is_focusable(field)
+
+    # The field kept its position right before its neighbour.
+    key_input.focus(neighbour)
+    key_input.focus_next(reverse=True)
+    assert key_input.focused_view is field
@@ -0,0 +1,71 @@
+import skia
+
+from core.base import View
+from core.color import Color
+from core.display_list import RecordingCanvas
+from core.offscreen import render_view, record_picture
+from views.rectangle import Rectangle
+
+from tests.helpers import make_image, read_pixels
+
+
+class Square(View):
+    def body(self):
+        return Rectangle(32, 32).background(Color.black())
+
+
+def test_body_root_is_drawn_once():
+    canvas = RecordingCanvas(32, 32)
+    Square().draw(canvas, 0, 0, 32, 32)
+    assert len(canvas.finish()) == 1
+
+
+def test_layer_opacity_is_applied_once():
+    pixels = render_view(Square().opacity(0.5), 32, 32)
+    red, green, blue, alpha = pixels[16, 16]
+    assert abs(int(red) - 128) <= 1
+    assert red == green == blue
+    assert alpha == 255
+
+
+def test_layer_opacity_without_surface():
+    # Recording a picture has no surface to rasterize the layer to, it is composited directly.
+    canvas = RecordingCanvas(32, 32)
+    Square().opacity(0.5).draw(canvas, 0, 0, 32, 32)
+    picture = record_picture(canvas.finish(), 32, 32)
+
+    surface = skia.Surface(32, 32)
+    surface.getCanvas().clear(skia.ColorWHITE)
+    surface.getCanvas().drawPicture(picture)
+    red, green, blue, alpha = read_pixels(surface)[16, 16]
+    assert abs(int(red) - 128) <= 1
+
+
+def test_replay_image_rect_with_paint():
+    canvas = RecordingCanvas(16, 16)
+    paint = skia.Paint()
+    paint.setAlphaf(0.5)
+    image = make_image(8, 8, skia.ColorBLACK)
+    # Scaled, so that it is not batched as a sprite.
+    canvas.drawImageRect(image, skia.Rect.MakeWH(8, 8), skia.Rect.MakeWH(16, 16), paint=paint)
+
+    surface = skia.Surface(16, 16)
+    surface.getCanvas().clear(skia.ColorWHITE)
+    canvas.finish().replay(surface.getCanvas())
+    red, green, blue, alpha = read_pixels(surface)[8, 8]
+    assert abs(int(red) - 128) <= 1
+
+
+def test_culled_views_on_plain_and_recording_canvases():
+    surface = skia.Surface(16, 16)
+    canvas = surface.getCanvas()
+    canvas.clear(skia.ColorWHITE)
+    Square().draw(canvas, 0, 0, 16, 16)
+    # Entirely outside of the surface.
+    Square().draw(canvas, 100, 100, 16, 16)
+    assert tuple(read_pixels(surface)[4, 4]) == (0, 0, 0, 255)
+
+    recording = RecordingCanvas(16, 16)
+    Square().draw(recording, 0, 0, 16, 16)
+    Square().draw(recording, 100, 100, 16, 16)
+    assert recording.culled_views == 1
@@ -0,0 +1,51 @@
+from core.base import View
+from core.memory import iter_tree, measure_tree, format_memory_report
+from core.offscreen import record_view
+from views.flex import Flex
+from views.rectangle import Rectangle
+from views.text import Text
+
+_shared_body = Text('Shared')
+
+
+class Card(View):
+    def body(self):
+        with Flex().vertical() as root:
+            Text('Title')
+            Rectangle(10, 10)
+            Rectangle(10, 10)
+        return root
+
+
+class Page(View):
+    def body(self):
+        with Flex() as root:
+            Card()
+            Card()
+        return root
+
+
+class Borrowed(View):
+    # The body root was created outside of body(), it is not one of the children.
+    def body(self):
+        return _shared_body
+
+
+def test_every_view_is_counted_once():
+    page = Page()
+    record_view(page, 200, 200)
+    views = list(iter_tree(page))
+    assert len(views) == len({id(view) for view in views})
+
+    memory = measure_tree(page)
+    counts = {name: class_memory.count for name, class_memory in memory.items()}
+    assert counts == {'Page': 1, 'Flex': 3, 'Card': 2, 'Text': 2, 'Rectangle': 4}
+    assert all(class_memory.bytes > 0 for class_memory in memory.values())
+    assert format_memory_report(memory).endswith(f'Total: 12 views, {sum(m.bytes for m in memory.values())} bytes')
+
+
+def test_body_created_elsewhere_is_counted():
+    view = Borrowed()
+    record_view(view, 100, 100)
+    counts = {name: class_memory.count for name, class_memory in measure_tree(view).items()}
+    assert counts == {'Borrowed': 1, 'Text': 1}
@@ -0,0 +1,24 @@
+import numpy as np
+import pytest
+
+from core.color import Color
+from core.offscreen import render_view
+from views.flex import Flex
+from views.rectangle import Rectangle
+
+
+def make_view() -> Flex:
+    # Rounded corners at fractional positions cross the edges of small tiles.
+    with Flex().vertical() as root:
+        for index in range(6):
+            Rectangle(97 + index * 7.3, 13.7).background(Color.red()).radius(6.3).margin(3.3, 1.7)
+    return root
+
+
+@pytest.mark.parametrize('scale', [1, 1.5, 2])
+@pytest.mark.parametrize('tile_size', [17, 32, 64])
+def test_tiles_match_the_untiled_render(scale, tile_size):
+    untiled = render_view(make_view(), 160, 140, scale=scale)
+    tiled = render_view(make_view(), 160, 140, scale=scale, tile_size=tile_size)
+    assert tiled.shape == untiled.shape
+    assert np.array_equal(tiled, untiled)
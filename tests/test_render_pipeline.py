@@ -0,0 +1,73 @@
+import threading
+
+from core.display_list import DisplayList
+from core.render_pipeline import RenderPipeline
+
+
+class Recorder:
+    """
+    Records nothing until record is set, and fails once when fail is set.
+    """
+
+    def __init__(self):
+        self.record = False
+        self.fail = False
+        self.failed = threading.Event()
+        self.recorded = threading.Event()
+        self.called = threading.Event()
+
+    def __call__(self):
+        self.called.set()
+        if self.fail:
+            self.fail = False
+            self.failed.set()
+            raise RuntimeError('Recording failed.')
+        if not self.record:
+            return None
+        self.recorded.set()
+        return DisplayList()
+
+    def start_recording(self):
+        self.record = True
+
+
+def start_pipeline(recorder: Recorder):
+    woken = threading.Event()
+    pipeline = RenderPipeline(recorder, woken.set)
+    pipeline.start()
+    return pipeline, woken
+
+
+def test_inputs_of_frames_recording_nothing_are_carried_over():
+    recorder = Recorder()
+    pipeline, woken = start_pipeline(recorder)
+    try:
+        pipeline.submit(lambda: None, timestamp=1.0)
+        # Recorded nothing for the first input.
+        assert recorder.called.wait(5)
+        pipeline.submit(recorder.start_recording, timestamp=2.0)
+        assert recorder.recorded.wait(5) and woken.wait(5)
+        assert pipeline.take_frame().input_times == [1.0, 2.0]
+    finally:
+        pipeline.stop()
+
+
+def test_failing_task_and_recording_do_not_stop_the_thread(capsys):
+    recorder = Recorder()
+    recorder.fail = True
+
+    def fail():
+        raise ValueError('Handler failed.')
+
+    pipeline, woken = start_pipeline(recorder)
+    try:
+        pipeline.submit(fail, timestamp=1.0)
+        assert recorder.failed.wait(5)
+        pipeline.submit(recorder.start_recording, timestamp=2.0)
+        assert recorder.recorded.wait(5) and woken.wait(5)
+        assert pipeline.take_frame().input_times == [1.0, 2.0]
+    finally:
+        pipeline.stop()
+    error = capsys.readouterr().err
+    assert 'Handler failed.' in error
+    assert 'Recording failed.' in error
@@ -0,0 +1,10 @@
+import skia
+
+from core.shaders import warm_up
+
+
+def test_warm_up_draws_every_primitive():
+    context = skia.GrDirectContext.MakeMock(None)
+    warm_up(context)
+    # The offscreen surface is released, its texture is left in the resource cache.
+    assert context.getResourceCachePurgeableBytes() > 0
@@ -0,0 +1,64 @@
+import os
+
+import numpy as np
+import pytest
+
+from core.color import Color
+from core.snapshot import assert_snapshot, read_png, write_png, SnapshotMismatch, UPDATE_ENV
+from views.flex import Flex
+from views.rectangle import Rectangle
+
+SIZE = (48, 32)
+
+
+def make_view(color: Color) -> Flex:
+    with Flex().background(Color.white()) as flex:
+        Rectangle(16, 16).background(color)
+    return flex
+
+
+@pytest.fixture(autouse=True)
+def no_update(monkeypatch):
+    monkeypatch.delenv(UPDATE_ENV, raising=False)
+
+
+def test_png_round_trip(tmp_path):
+    pixels = np.zeros((4, 6, 4), dtype=np.uint8)
+    pixels[..., 0] = 255
+    pixels[..., 3] = 255
+    pixels[1, 2] = (0, 128, 255, 255)
+    path = str(tmp_path / 'pixels.png')
+    write_png(path, pixels)
+    assert np.array_equal(read_png(path), pixels)
+
+
+def test_missing_golden_is_written_then_matched(tmp_path):
+    directory = str(tmp_path)
+    assert_snapshot(make_view(Color.red()), 'square', SIZE, directory)
+    golden = read_png(os.path.join(directory, 'square.png'))
+    assert golden.shape == (SIZE[1], SIZE[0], 4)
+    assert list(golden[8, 8]) == [255, 0, 0, 255]
+
+    assert_snapshot(make_view(Color.red()), 'square', SIZE, directory)
+
+
+def test_mismatch_writes_actual_and_diff(tmp_path):
+    directory = str(tmp_path)
+    assert_snapshot(make_view(Color.red()), 'square', SIZE, directory)
+
+    with pytest.raises(SnapshotMismatch):
+        assert_snapshot(make_view(Color.black()), 'square', SIZE, directory)
+    actual = read_png(os.path.join(directory, 'square.actual.png'))
+    diff = read_png(os.path.join(directory, 'square.diff.png'))
+    assert list(actual[8, 8]) == [0, 0, 0, 255]
+    assert list(diff[8, 8]) == [255, 0, 0, 255]
+    # Matching pixels are faded, not marked.
+    assert list(diff[8, 40]) == [254, 254, 254, 255]
+
+
+def test_update_overwrites_golden(tmp_path, monkeypatch):
+    directory = str(tmp_path)
+    assert_snapshot(make_view(Color.red()), 'square', SIZE, directory)
+    monkeypatch.setenv(UPDATE_ENV, '1')
+    assert_snapshot(make_view(Color.black()), 'square', SIZE, directory)
+    assert list(read_png(os.path.join(directory, 'square.png'))[8, 8]) == [0, 0, 0, 255]
@@ -0,0 +1,39 @@
+import skia
+
+from core import style
+from core.color import Color
+from core.style import Style, StyleSheet
+from views.rectangle import Rectangle
+from views.text import Text
+
+
+def test_equal_values_are_interned():
+    first = Style.compile(background=Color(10, 20, 30), margin=(4, 8))
+    second = Style.compile(margin=[4, 8], background=Color(10, 20, 30))
+    assert first is second
+    assert Style.compile(background='#0a141e', margin=(4, 8)) is first
+    assert Style.compile(background=Color(10, 20, 31), margin=(4, 8)) is not first
+
+
+def test_fresh_color_literals_do_not_grow_the_cache():
+    Style.compile(color=Color(1, 2, 3))
+    size = len(style._STYLES)
+    for _ in range(100):
+        Style.compile(color=Color(1, 2, 3))
+    assert len(style._STYLES) == size
+
+
+def test_cache_is_bounded():
+    for value in range(style.CACHE_SIZE + 10):
+        Style.compile(radius=value)
+    assert len(style._STYLES) == style.CACHE_SIZE
+
+
+def test_apply_skips_missing_setters():
+    sheet = StyleSheet(card={'background': '#ff0000', 'radius': 4, 'size': 20})
+    rectangle = Rectangle(10, 10).style(sheet.card)
+    text = Text('Hello').style(sheet.card)
+    assert rectangle._background.as_skia_color() == skia.ColorRED
+    assert rectangle._radius == 4
+    assert text._Text__size == 20
+    assert sheet.card.extend(radius=8).properties()['radius'] == 8
@@ -0,0 +1,99 @@
+import gc
+import weakref
+
+from core.base import View
+from core.data import State
+from core.key_input import KeyInput
+from core.offscreen import record_view
+from core.text_buffer import TextBuffer
+from views.input import Input
+
+
+def measure(text: str):
+    # Every character is as wide as its position in the alphabet, so offsets identify them.
+    return [float(ord(char) - ord('a') + 1) for char in text]
+
+
+def test_insert_appends_at_the_caret():
+    buffer = TextBuffer('ab', measure)
+    assert (buffer.text, buffer.caret, buffer.width) == ('ab', 2, 3.0)
+
+    buffer.move_caret(-1)
+    buffer.insert('cd')
+    assert buffer.text == 'acdb'
+    assert buffer.caret == 3
+    assert buffer.caret_offset == 1.0 + 3.0 + 4.0
+    assert buffer.width == 10.0
+    assert len(buffer) == 4
+
+
+def test_delete_around_the_caret():
+    buffer = TextBuffer('abcd', measure)
+    buffer.move_caret(-2)
+
+    buffer.delete_backward()
+    assert (buffer.text, buffer.caret, buffer.caret_offset, buffer.width) == ('acd', 1, 1.0, 8.0)
+
+    buffer.delete_forward()
+    assert (buffer.text, buffer.caret, buffer.caret_offset, buffer.width) == ('ad', 1, 1.0, 5.0)
+
+    # Deleting past either end stops there.
+    buffer.delete_backward(5)
+    buffer.delete_forward(5)
+    assert (buffer.text, buffer.caret, buffer.caret_offset, buffer.width) == ('', 0, 0.0, 0.0)
+
+
+def test_move_caret_is_clamped():
+    buffer = TextBuffer('abc', measure)
+    buffer.move_caret(-10)
+    assert (buffer.caret, buffer.caret_offset) == (0, 0.0)
+    buffer.move_caret(2)
+    assert (buffer.caret, buffer.caret_offset) == (2, 3.0)
+    buffer.move_caret(10)
+    assert (buffer.caret, buffer.caret_offset) == (3, 6.0)
+
+
+def test_reset_keeps_the_caret_within_the_text():
+    buffer = TextBuffer('abcd', measure)
+    buffer.move_caret(-1)
+
+    buffer.reset('xy', buffer.caret)
+    assert (buffer.text, buffer.caret) == ('xy', 2)
+    assert buffer.caret_offset == buffer.width == measure('x')[0] + measure('y')[0]
+
+    buffer.reset('abc', 1)
+    assert (buffer.text, buffer.caret, buffer.caret_offset, buffer.width) == ('abc', 1, 1.0, 6.0)
+
+
+def test_only_inserted_text_is_measured():
+    measured = []
+
+    def counting_measure(text):
+        measured.append(text)
+        return measure(text)
+
+    buffer = TextBuffer('abc', counting_measure)
+    buffer.move_caret(-1)
+    buffer.insert('d')
+    buffer.delete_backward()
+    buffer.move_caret(1)
+    assert measured == ['abc', 'd']
+
+
+def test_discarded_inputs_are_collected():
+    class Form(View):
+        name = State('abc')
+
+        def body(self):
+            return Input(self.binding('name'))
+
+    form = Form().context(KeyInput())
+    record_view(form, 200, 100)
+    first_input = weakref.ref(form.get_children()[0])
+
+    # The text buffer outlives the rebuilt Input.
+    form.name = 'abcd'
+    record_view(form, 200, 100)
+    gc.collect()
+    assert first_input() is None
+    assert form.get_children()[0].get_bounding_rect().width > 0
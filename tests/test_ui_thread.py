@@ -0,0 +1,105 @@
+import threading
+
+import pytest
+
+from core.app import App
+from core.base import View
+from core.data import State
+from core.ui_thread import UIThread, UI_THREAD
+
+
+class Counter(View):
+    count = State(0)
+
+
+@pytest.fixture
+def ui_thread():
+    # The test thread plays the UI thread, other threads post to it.
+    UI_THREAD.attach(wake=lambda: None)
+    yield UI_THREAD
+    UI_THREAD.drain()
+    UI_THREAD.detach()
+
+
+def run_in_thread(target):
+    thread = threading.Thread(target=target)
+    thread.start()
+    thread.join()
+
+
+def test_posted_tasks_run_when_drained():
+    ui_thread = UIThread()
+    woken = []
+    ui_thread.attach(wake=lambda: woken.append(True))
+    ran = []
+    run_in_thread(lambda: ui_thread.run(lambda: ran.append(threading.get_ident())))
+    assert ran == [] and woken == [True]
+
+    assert ui_thread.drain() == 1
+    assert ran == [threading.get_ident()]
+    # On the UI thread, tasks run right away.
+    ui_thread.run(lambda: ran.append(None))
+    assert len(ran) == 2 and len(ui_thread) == 0
+
+
+def test_tasks_posted_while_draining_wait_for_the_next_drain():
+    ui_thread = UIThread()
+    ui_thread.attach(wake=lambda: None)
+    ran = []
+
+    def repost():
+        ran.append(len(ran))
+        ui_thread.post(repost)
+
+    ui_thread.post(repost)
+    assert ui_thread.drain() == 1
+    assert ran == [0] and len(ui_thread) == 1
+    assert ui_thread.drain() == 1
+    assert ran == [0, 1]
+
+
+def test_state_written_from_another_thread(ui_thread):
+    counter = Counter()
+    seen = []
+
+    def increment():
+        counter.count += 1
+        counter.count += 1
+        seen.append(counter.count)
+
+    run_in_thread(increment)
+    # The writing thread reads its own writes, the UI thread sees them at the next frame.
+    assert seen == [2]
+    assert counter.count == 0
+    ui_thread.drain()
+    assert counter.count == 2
+
+    # Writes are applied in order, the last one wins.
+    run_in_thread(increment)
+    counter.count = 10
+    ui_thread.drain()
+    assert counter.count == 4
+
+
+def test_async_handlers_run_on_the_asyncio_loop(ui_thread):
+    counter = Counter()
+    done = threading.Event()
+
+    async def on_click():
+        counter.count += 1
+        done.set()
+
+    counter.on_click(on_click)
+    counter.private.handle_click()
+    assert done.wait(5)
+    assert counter.count == 0
+    ui_thread.drain()
+    assert counter.count == 1
+
+
+def test_run_async_returns_the_result():
+    async def answer():
+        return threading.current_thread().name
+
+    future = App(View()).run_async(answer())
+    assert future.result(timeout=5) == 'asyncio'
@@ -1,7 +1,28 @@
-from .hbox import HBox
-from .vbox import VBox
-from .text import Text
-from .rectangle import Rectangle
-from .image import Image
-from .flex import Flex
-from .input import Input
+import importlib
+
+# Views are imported on first use, so that importing one of them does not load all the others.
+_MODULES = {
+    'HBox': '.hbox',
+    'VBox': '.vbox',
+    'Text': '.text',
+    'Rectangle': '.rectangle',
+    'Image': '.image',
+    'Flex': '.flex',
+    'Grid': '.grid',
+    'Input': '.input',
+}
+
+__all__ = list(_MODULES)
+
+
+def __getattr__(name: str):
+    module_name = _MODULES.get(name)
+    if module_name is None:
+        raise AttributeError(f'module {__name__!r} has no attribute {name!r}')
+    value = getattr(importlib.import_module(module_name, __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_MODULES))
@@ -14,3 +14,9 @@ class Alignment:
 class Direction:
     HORIZONTAL = 'horizontal'
     VERTICAL = 'vertical'
+
+
+class Overflow:
+    VISIBLE = 'visible'
+    CLIP = 'clip'
+    HIDDEN = 'hidden'
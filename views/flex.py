@@ -1,18 +1,21 @@
 from __future__ import annotations
 
 import dataclasses
-from typing import List, Optional
+from typing import List, Optional, Dict, Tuple
 
 import skia
 
 from core.base import View, Rect
 from core.color import Color
-from .enums import Justify, Alignment, Direction
+from .enums import Justify, Alignment, Direction, Overflow
+
+
+LAYOUT_CACHE_SIZE = 4
 
 
 class Flex(View):
     __slots__ = (
-        '_alignment', '_justify', '_direction', '_height', '_width', '_wrap', '_grow', '_layout_cache',
+        '_alignment', '_justify', '_direction', '_wrap', '_grow', '_layout_cache',
         '_background', '__debug',
     )
 
@@ -24,8 +27,8 @@ class Flex(View):
         self._height = None
         self._width = None
         self._wrap = False
-        self._grow = {}
-        self._layout_cache: Optional[Layout] = None
+        self._grow: Optional[Dict[View, int]] = None
+        self._layout_cache: Dict[Tuple[float, float], Layout] = {}
         self._background: Optional[Color] = None
         self.__debug = False
 
@@ -40,6 +43,7 @@ class Flex(View):
         )
 
         for view in self._children:
+            view.constrain_width(available_width)
             bounding_rect = view.get_bounding_rect()
             item_advance = self._get_advance(bounding_rect.width, bounding_rect.height)
             item_spread = self._get_spread(bounding_rect.width, bounding_rect.height)
@@ -69,14 +73,20 @@ class Flex(View):
         return groups, max_spread
 
     def _get_layout(self, available_width: float, available_height: float) -> Layout:
-        # if self._layout_cache:
-        #     return self._layout_cache
+        # Layout only depends on the constraints until invalidate_layout() is called, resizing
+        # the window only lays out again the views it gives a different size.
+        constraints = (available_width, available_height)
+        layout = self._layout_cache.get(constraints)
+        if layout is not None:
+            for layout_item in layout.items:
+                layout_item.view.constrain_width(layout.available_width)
+            return layout
 
         available_width -= self._left_padding + self._right_padding
         available_height -= self._top_padding + self._bottom_padding
 
         groups, max_spread = self._get_groups(available_width, available_height)
-        grow_sum = sum(self._grow.values())
+        grow_sum = sum(self._grow.values()) if self._grow else 0
 
         content_pr = 0
         content_pp = 0
@@ -137,8 +147,14 @@ class Flex(View):
         if self._direction == Direction.VERTICAL:
             flex_width, flex_height = flex_height, flex_width
 
-        self._layout_cache = Layout(layout_items, flex_width, flex_height)
-        return self._layout_cache
+        layout = Layout(layout_items, flex_width, flex_height, available_width)
+        if len(self._layout_cache) >= LAYOUT_CACHE_SIZE:
+            del self._layout_cache[next(iter(self._layout_cache))]
+        self._layout_cache[constraints] = layout
+        return layout
+
+    def _clear_layout_cache(self):
+        self._layout_cache = {}
 
     def paint(self, canvas: skia.Canvas, x: float, y: float, width: float, height: float) -> None:
         x += self._x + self._left_padding + self._left_margin
@@ -152,7 +168,7 @@ class Flex(View):
         if self._background:
             canvas.drawRect(
                 skia.Rect.MakeXYWH(x, y, layout.width, layout.height),  # noqa
-                skia.Paint(Color=self._background.as_skia_color()),  # noqa
+                self._background.as_paint(),  # noqa
             )
 
         for layout_item in layout.items:
@@ -171,12 +187,30 @@ class Flex(View):
         view_width = self._width or 500
         view_height = self._height or 500
         layout = self._get_layout(view_width, view_height)
+        content_width = layout.width
+        content_height = layout.height
+        if self.__clips():
+            # Clipped content does not overflow the size set with width() and height().
+            content_width = self._width or content_width
+            content_height = self._height or content_height
 
         return Rect(
             x=0,
             y=0,
-            width=self._left_margin + layout.width + self._right_margin,
-            height=self._top_margin + layout.height + self._bottom_margin,
+            width=self._left_margin + content_width + self._right_margin,
+            height=self._top_margin + content_height + self._bottom_margin,
+        )
+
+    def __clips(self) -> bool:
+        return self._layer is not None and self._layer.clip
+
+    def _get_clip_bounds(self, x: float, y: float, width: float, height: float) -> Tuple[float, float, float, float]:
+        # The box set with width() and height(), the parent may give the Flex the size of its content.
+        return (
+            x + self._x + self._left_margin,
+            y + self._y + self._top_margin,
+            self._width or width - self._left_margin - self._right_margin,
+            self._height or height - self._top_margin - self._bottom_margin,
         )
 
     def _direction_choice(self, horizontal_choice, vertical_choice):
@@ -242,13 +276,27 @@ class Flex(View):
     def grow(self, view: View, priority: int) -> Flex:
         if view not in self._children:
             raise RuntimeError('Flex.grow() can only accept children.')
+        if self._grow is None:
+            self._grow = {}
         self._grow[view] = priority
         return self
 
+    @property
+    def current_background(self) -> Optional[Color]:
+        return self._background
+
     def background(self, color: Color) -> Flex:
         self._background = color
         return self
 
+    def overflow(self, overflow) -> Flex:
+        """
+        Overflow.CLIP clips children to the bounds of the Flex, Overflow.HIDDEN also stops the
+        clipped parts from receiving hover and click events.
+        """
+        self.clip(overflow != Overflow.VISIBLE, clip_hover=overflow == Overflow.HIDDEN)
+        return self
+
     def debug(self):
         self.__debug = True
         return self
@@ -268,3 +316,4 @@ class Layout:
     items: List[LayoutItem]
     width: float
     height: float
+    available_width: float
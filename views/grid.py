@@ -0,0 +1,250 @@
+from __future__ import annotations
+
+import dataclasses
+import math
+from typing import List, Optional, Dict, Tuple, Sequence, Union
+
+import skia
+
+from core.base import View, Rect
+from core.color import Color
+from .flex import LayoutItem, LAYOUT_CACHE_SIZE
+
+FIXED = 'fixed'
+FRACTION = 'fr'
+AUTO = 'auto'
+
+
+class Track:
+    """
+    Size of a row or a column: a fixed size, a fraction of the space left by the other tracks
+    or the size of its largest cell.
+    """
+    __slots__ = ('kind', 'value')
+
+    def __init__(self, kind: str, value: float = 0):
+        self.kind = kind
+        self.value = value
+
+    @classmethod
+    def parse(cls, track: Union[Track, float, str]) -> Track:
+        if isinstance(track, Track):
+            return track
+        if isinstance(track, (int, float)):
+            return cls(FIXED, track)
+        if track == AUTO:
+            return cls(AUTO)
+        if track.endswith(FRACTION):
+            return cls(FRACTION, float(track[:-len(FRACTION)] or 1))
+        if track.endswith('px'):
+            return cls(FIXED, float(track[:-2]))
+        raise ValueError(f'Invalid grid track "{track}", expected a number, "auto", "<n>px" or "<n>fr".')
+
+
+def _parse_columns(tracks: Sequence) -> List[Track]:
+    if not tracks:
+        raise ValueError('A grid needs at least one column.')
+    return [Track.parse(track) for track in tracks]
+
+
+def solve_tracks(tracks: List[Track], content_sizes: List[float], available: float, gap: float) -> List[float]:
+    """
+    Returns the size of every track. Fractions share the space left by fixed and auto tracks,
+    they size to their content when the available space is unbounded.
+    """
+    unbounded = math.isinf(available)
+    sizes = []
+    fractions = 0
+    for track, content_size in zip(tracks, content_sizes):
+        if track.kind == FIXED:
+            sizes.append(track.value)
+        elif track.kind == AUTO or unbounded:
+            sizes.append(content_size)
+        else:
+            sizes.append(0)
+            fractions += track.value
+
+    if fractions:
+        leftover = max(0.0, available - sum(sizes) - gap * (len(tracks) - 1))
+        for index, track in enumerate(tracks):
+            if track.kind == FRACTION:
+                sizes[index] = leftover * track.value / fractions
+    return sizes
+
+
+class Grid(View):
+    """
+    Places children into cells row by row. Column widths are solved once for all rows, so cells
+    of a column line up and every child is measured once per layout.
+    """
+    __slots__ = (
+        '_columns', '_rows', '_column_gap', '_row_gap', '_background',
+        '_available_width', '_layout_cache',
+    )
+
+    def __init__(self, columns: Sequence = (AUTO, ), rows: Sequence = ()):
+        super(Grid, self).__init__()
+        self._columns: List[Track] = _parse_columns(columns)
+        self._rows: List[Track] = [Track.parse(track) for track in rows]
+        self._column_gap: float = 0
+        self._row_gap: float = 0
+        self._width = None
+        self._height = None
+        self._background: Optional[Color] = None
+        self._available_width: Optional[float] = None
+        self._layout_cache: Dict[Tuple[float, float], GridLayout] = {}
+
+    def __get_row_tracks(self, row_count: int) -> List[Track]:
+        # Rows beyond the defined ones size to their content.
+        return self._rows[:row_count] + [Track(AUTO)] * (row_count - len(self._rows))
+
+    def _get_layout(self, available_width: float, available_height: float) -> GridLayout:
+        constraints = (available_width, available_height)
+        layout = self._layout_cache.get(constraints)
+        if layout is not None:
+            for layout_item in layout.items:
+                layout_item.view.constrain_width(layout_item.width)
+            return layout
+
+        available_width -= self._left_padding + self._right_padding
+        available_height -= self._top_padding + self._bottom_padding
+        column_count = len(self._columns)
+        row_count = math.ceil(len(self._children) / column_count)
+        rows = self.__get_row_tracks(row_count)
+        unbounded_width = math.isinf(available_width)
+
+        # Cells whose column sizes to its content are measured before the columns are solved,
+        # the others once their column width is known.
+        rects: List[Optional[Rect]] = [None] * len(self._children)
+        column_content = [0.0] * column_count
+        for index, view in enumerate(self._children):
+            column = self._columns[index % column_count]
+            if column.kind == AUTO or (column.kind == FRACTION and unbounded_width):
+                view.constrain_width(available_width)
+                rects[index] = view.get_bounding_rect()
+                column_content[index % column_count] = max(column_content[index % column_count], rects[index].width)
+        column_widths = solve_tracks(self._columns, column_content, available_width, self._column_gap)
+
+        row_content = [0.0] * row_count
+        for index, view in enumerate(self._children):
+            if rects[index] is None:
+                view.constrain_width(column_widths[index % column_count])
+                rects[index] = view.get_bounding_rect()
+            row = index // column_count
+            row_content[row] = max(row_content[row], rects[index].height)
+        row_heights = solve_tracks(rows, row_content, available_height, self._row_gap)
+
+        column_offsets = _get_offsets(column_widths, self._column_gap)
+        row_offsets = _get_offsets(row_heights, self._row_gap)
+        layout_items = []
+        for index, view in enumerate(self._children):
+            row, column = divmod(index, column_count)
+            layout_items.append(LayoutItem(
+                view, column_offsets[column], row_offsets[row], column_widths[column], row_heights[row],
+            ))
+
+        layout = GridLayout(
+            layout_items,
+            sum(column_widths) + self._column_gap * max(0, column_count - 1),
+            sum(row_heights) + self._row_gap * max(0, row_count - 1),
+            column_widths,
+            row_heights,
+        )
+        if len(self._layout_cache) >= LAYOUT_CACHE_SIZE:
+            del self._layout_cache[next(iter(self._layout_cache))]
+        self._layout_cache[constraints] = layout
+        return layout
+
+    def _clear_layout_cache(self):
+        self._layout_cache = {}
+
+    def paint(self, canvas: skia.Canvas, x: float, y: float, width: float, height: float) -> None:
+        x += self._x + self._left_padding + self._left_margin
+        y += self._y + self._top_padding + self._top_margin
+
+        width = self._width or width - self._left_margin - self._right_margin
+        height = self._height or height - self._top_margin - self._bottom_margin
+
+        layout = self._get_layout(width, height)
+
+        if self._background:
+            canvas.drawRect(
+                skia.Rect.MakeXYWH(x, y, layout.width, layout.height),  # noqa
+                self._background.as_paint(),  # noqa
+            )
+
+        for layout_item in layout.items:
+            layout_item.view.draw(
+                canvas,
+                x + layout_item.x,
+                y + layout_item.y,
+                layout_item.width,
+                layout_item.height,
+            )
+
+    def draw_children(self, canvas: skia.Surface, x: float, y: float, width: float, height: float):
+        pass
+
+    def constrain_width(self, width: float):
+        self._available_width = width
+
+    def get_bounding_rect(self) -> Rect:
+        view_width = self._width or self._available_width or math.inf
+        view_height = self._height or math.inf
+        layout = self._get_layout(view_width, view_height)
+
+        return Rect(
+            x=0,
+            y=0,
+            width=self._left_margin + self._left_padding + layout.width + self._right_padding + self._right_margin,
+            height=self._top_margin + self._top_padding + layout.height + self._bottom_padding + self._bottom_margin,
+        )
+
+    # Properties
+
+    def columns(self, *tracks) -> Grid:
+        self._columns = _parse_columns(tracks)
+        return self
+
+    def rows(self, *tracks) -> Grid:
+        self._rows = [Track.parse(track) for track in tracks]
+        return self
+
+    def gap(self, column_gap: float, row_gap: float = None) -> Grid:
+        self._column_gap = column_gap
+        self._row_gap = column_gap if row_gap is None else row_gap
+        return self
+
+    def width(self, width: float) -> Grid:
+        self._width = width
+        return self
+
+    def height(self, height: float) -> Grid:
+        self._height = height
+        return self
+
+    @property
+    def current_background(self) -> Optional[Color]:
+        return self._background
+
+    def background(self, color: Color) -> Grid:
+        self._background = color
+        return self
+
+
+def _get_offsets(sizes: List[float], gap: float) -> List[float]:
+    offsets = []
+    offset = 0
+    for size in sizes:
+        offsets.append(offset)
+        offset += size + gap
+    return offsets
+
+
+@dataclasses.dataclass
+class GridLayout:
+    items: List[LayoutItem]
+    width: float
+    height: float
+    column_widths: List[float]
+    row_heights: List[float]
@@ -7,6 +7,8 @@ from views.enums import Alignment, Justify
 
 
 class HBox(View):
+    __slots__ = ('_alignment', '_justify', '_spacing', '_wrap', '_grow', '_view_width', '_view_height')
+
     def __init__(self):
         super(HBox, self).__init__()
         self._alignment = Alignment.BEGIN
@@ -1,5 +1,6 @@
 import skia
 
+from core.atlas import ImageAtlas, AtlasEntry
 from core.base import View, Rect
 
 
@@ -8,6 +9,9 @@ class Image(View):
 
     __cache = {}
 
+    # Small images such as icons share atlas pages instead of getting a texture each.
+    atlas = ImageAtlas()
+
     def __init__(self, filename: str, width: float, height: float):
         super(Image, self).__init__()
         self.__filename: str = filename
@@ -18,19 +22,35 @@ class Image(View):
         return Rect(0, 0, self._width, self._height)
 
     def load_image(self):
-        image = Image.__cache.get(self.__filename)
+        key = (self.__filename, self._width, self._height)
+        image = Image.__cache.get(key)
         if image is None:
             image = skia.Image.open(self.__filename).resize(self._width, self._height)  # noqa
-            Image.__cache[self.__filename] = image
+            Image.__cache[key] = image
         if image is None:
             raise RuntimeError(f'Image could not be loaded: {self.__filename}')
         return image
 
+    def get_atlas_entry(self) -> AtlasEntry:
+        if not Image.atlas.accepts(self._width, self._height):
+            return None
+        key = (self.__filename, self._width, self._height)
+        entry = Image.atlas.get(key)
+        if entry is None:
+            entry = Image.atlas.add(key, self.load_image())
+            # The resized image now lives in the atlas page.
+            Image.__cache.pop(key, None)
+        return entry
+
     def paint(self, canvas: skia.Canvas, x: float, y: float, width: float, height: float):
         x += self._x + self._left_margin + self._left_padding
         y += self._y + self._top_margin + self._top_padding
-        image = self.load_image()
+        dst = skia.Rect.MakeXYWH(x, y, self._width, self._height)
 
-        canvas.drawImageRect(image, skia.Rect.MakeXYWH(x, y, self._width, self._height))  # noqa
+        entry = self.get_atlas_entry()
+        if entry is not None:
+            canvas.drawImageRect(entry.page.image, entry.src, dst)  # noqa
+        else:
+            canvas.drawImageRect(self.load_image(), dst)  # noqa
 
         self.draw_children(canvas, x,  y, width, height)
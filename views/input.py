@@ -1,4 +1,6 @@
-from typing import Optional
+import weakref
+from functools import partial
+from typing import Optional, List
 
 import skia
 
@@ -6,71 +8,116 @@ from core.base import View, Rect
 from core.color import Color
 from core.data import ContextProperty, Binding, DataBinding
 from core.key_input import KeyInput, Keys, KeyListener
+from core.fonts import get_font, get_line_height
+from core.text_buffer import TextBuffer
+
+
+def _measure(size: int, text: str) -> List[float]:
+    font = get_font(size, subpixel=True)
+    return font.getWidths(font.textToGlyphs(text))
 
 
 class Input(View, KeyListener):
-    __slots__ = ('__color', '__size', )
+    __slots__ = ('__color', '__size', '__background', '__text_binding', '__buffer', )
 
     __key_input: KeyInput = ContextProperty()
 
+    # Inputs are recreated whenever the view owning their text is rebuilt, the text buffer
+    # lives as long as that view.
+    __buffers = weakref.WeakKeyDictionary()
+
     text = Binding()
 
     def __init__(self, text: DataBinding):
         super(Input, self).__init__(text=text)
+        self.__text_binding = text
         self.__color: Color = Color.black()
         self.__size: int = 16
         self.__key_input.add_listener(self)
         self.__background: Optional[Color] = None
-        self.__caret_pos: int = 3
+        self.__buffer: Optional[TextBuffer] = None
+
+    def __get_buffer(self) -> TextBuffer:
+        if self.__buffer is not None:
+            return self.__buffer
+
+        buffers = Input.__buffers.setdefault(self.__text_binding.owner, {})
+        key = (self.__text_binding.property_name, self.__size)
+        buffer = buffers.get(key)
+        text = self.text
+        if buffer is None:
+            # Buffers outlive the Input creating them, they must not hold on to it.
+            buffer = TextBuffer(text, partial(_measure, self.__size))
+            buffers[key] = buffer
+        elif buffer.text != text:
+            # Text was changed from outside of the Input.
+            buffer.reset(text, buffer.caret)
+        self.__buffer = buffer
+        return buffer
 
     def paint(self, canvas: skia.Canvas, x: float, y: float, width: float, height: float):
-        paint = skia.Paint(Color=self.__color.as_skia_color())
-        font = skia.Font(None, self.__size)
-        font.setSubpixel(True)
-        metrics = font.getMetrics()
-        text_width = font.measureText(self.text, skia.TextEncoding.kUTF8)
-        line_height = abs(metrics.fTop) + abs(metrics.fBottom)
+        buffer = self.__get_buffer()
+        paint = self.__color.as_paint()
+        font = get_font(self.__size, subpixel=True)
+        line_height, descent = get_line_height(font)
 
         if self.__background:
             canvas.drawRect(
-                skia.Rect.MakeXYWH(x, y, text_width, line_height),
-                skia.Paint(Color=self.__background.as_skia_color()),
+                skia.Rect.MakeXYWH(x, y, buffer.width, line_height),
+                self.__background.as_paint(),
             )
 
-        canvas.drawString(self.text, x, y + line_height - metrics.fBottom, font, paint)
+        canvas.drawString(buffer.text, x, y + line_height - descent, font, paint)
 
-        caret_offset = font.measureText(
-            self.text[:self.__caret_pos],
-            skia.TextEncoding.kUTF8,
-            paint=paint,
-        )
+        if self.__key_input.focused_view is not self:
+            return
+        caret_offset = buffer.caret_offset
         canvas.drawLine(x + caret_offset, y, x + caret_offset, y + line_height, paint)
 
     def get_bounding_rect(self) -> Rect:
-        font = skia.Font(None, self.__size)
-        metrics = font.getMetrics()
-        text_width = font.measureText(self.text, skia.TextEncoding.kUTF8)
-        line_height = abs(metrics.fTop) + abs(metrics.fBottom)
-        return Rect(0, 0, text_width, line_height)
+        line_height, _ = get_line_height(get_font(self.__size, subpixel=True))
+        return Rect(0, 0, self.__get_buffer().width, line_height)
+
+    def focus_key(self):
+        return self.__text_binding.key
+
+    def handle_focus(self, focused: bool):
+        # Only the caret changes.
+        self.request_repaint()
 
     def handle_char(self, char: str):
-        self.text = self.text[:self.__caret_pos] + char + self.text[self.__caret_pos:]
-        self.__caret_pos += 1
+        buffer = self.__get_buffer()
+        buffer.insert(char)
+        self.text = buffer.text
+        return True
 
     def handle_key(self, key: int, action: int):
-        if key == Keys.ARROW_RIGHT and action == 1:
-            self.__caret_pos = min(self.__caret_pos + 1, len(self.text))
-        elif key == Keys.ARROW_LEFT and action == 1:
-            self.__caret_pos = max(self.__caret_pos - 1, 0)
-        elif key == Keys.BACKSPACE and action == 1:
-            self.text = (
-                    self.text[:max(0, self.__caret_pos - 1)]
-                    + self.text[self.__caret_pos:]
-            )
-            self.__caret_pos = max(0, self.__caret_pos - 1)
+        if action != 1:
+            return False
+        buffer = self.__get_buffer()
+        if key == Keys.ARROW_RIGHT:
+            buffer.move_caret(1)
+            self.request_repaint()
+        elif key == Keys.ARROW_LEFT:
+            buffer.move_caret(-1)
+            self.request_repaint()
+        elif key == Keys.BACKSPACE:
+            buffer.delete_backward()
+            self.text = buffer.text
+        else:
+            return False
+        return True
 
     # Properties
 
+    @property
+    def current_color(self) -> Color:
+        return self.__color
+
+    @property
+    def current_background(self) -> Optional[Color]:
+        return self.__background
+
     def color(self, color: Color) -> 'Input':
         self.__color = color
         return self
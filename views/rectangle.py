@@ -5,12 +5,13 @@ from core.color import Color
 
 
 class Rectangle(View):
+    __slots__ = ('_background', '_radius')
+
     def __init__(self, width=None, height=None):
         super().__init__()
         self._background: Color = Color.white()
         self._width = width
         self._height = height
-        self._opacity = 1
         self._radius = 0
 
     def paint(self, canvas: skia.Canvas, x: float, y: float, width: float, height: float):
@@ -19,7 +20,7 @@ class Rectangle(View):
         rect_width = width - self._left_margin - self._right_margin
         rect_height = height - self._top_margin - self._bottom_margin
         rect = skia.Rect(x, y, x + rect_width, y + rect_height)
-        paint = skia.Paint(Color=self._background.as_skia_color())
+        paint = self._background.as_paint()
         if self._radius > 0:
             canvas.drawRoundRect(rect, self._radius, self._radius, paint)  # noqa
         else:
@@ -39,14 +40,14 @@ class Rectangle(View):
             ),
         )
 
+    @property
+    def current_background(self) -> Color:
+        return self._background
+
     def background(self, color: Color) -> 'Rectangle':
         self._background = color
         return self
 
-    def opacity(self, opacity: float) -> 'Rectangle':
-        self._opacity = opacity
-        return self
-
     def radius(self, radius: float) -> 'Rectangle':
         self._radius = radius
         return self
@@ -4,9 +4,13 @@ import skia
 
 from core.base import View, Rect
 from core.color import Color
+from core.fonts import get_font
+from core.paragraph import Paragraph, get_paragraph
 
 
 class Text(View):
+    __slots__ = ('__text', '__color', '__size', '__background', '__wrap', '__max_width', '__paint_width')
+
     def __init__(self, text):
         super().__init__()
         assert type(text) is str, 'Text must be of type "str".'
@@ -14,31 +18,64 @@ class Text(View):
         self.__color: Color = Color.black()
         self.__size = 14
         self.__background: Optional[Color] = None
+        self.__wrap = False
+        self.__max_width: Optional[float] = None
+        self.__paint_width: Optional[float] = None
+
+    def __get_paragraph(self) -> Paragraph:
+        return get_paragraph(self.__text, self.__size)
+
+    def __get_line_width(self) -> Optional[float]:
+        if not self.__wrap:
+            return None
+        # Unless a container constrained it, text wraps and is measured at the width it is painted in.
+        return self.__max_width if self.__max_width is not None else self.__paint_width
+
+    def __set_paint_width(self, width: float):
+        if not self.__wrap or self.__max_width is not None or width == self.__paint_width:
+            return
+        self.__paint_width = width
+        # Parents may have measured it for another width, they lay it out again on the next frame.
+        self.invalidate_layout()
+        self.request_repaint()
+
+    def constrain_width(self, width: float):
+        self.__max_width = width
 
     def paint(self, canvas: skia.Canvas, x: float, y: float, width: float, height: float):
         x += self._x
         y += self._y
-        paint = skia.Paint(Color=self.__color.as_skia_color())
-        font = skia.Font(None, self.__size)
-        text_width = font.measureText(self.__text, skia.TextEncoding.kUTF8)
-        metrics = font.getMetrics()
-        line_height = abs(metrics.fTop) + abs(metrics.fBottom)
+        paint = self.__color.as_paint()
+        font = get_font(self.__size)
+        paragraph = self.__get_paragraph()
+        self.__set_paint_width(width)
+        lines = paragraph.layout(self.__get_line_width())
 
         if self.__background:
-            canvas.drawRect(
-                skia.Rect.MakeXYWH(x, y, text_width, line_height),
-                skia.Paint(Color=self.__background.as_skia_color()),
-            )
-        canvas.drawString(self.__text, x, y + line_height - metrics.fBottom, font, paint)
+            background_paint = self.__background.as_paint()
+            for index, line in enumerate(lines):
+                canvas.drawRect(
+                    skia.Rect.MakeXYWH(x, y + index * paragraph.line_height, line.width, paragraph.line_height),
+                    background_paint,
+                )
+        baseline = y + paragraph.line_height - paragraph.descent
+        for line in lines:
+            canvas.drawString(line.text, x, baseline, font, paint)
+            baseline += paragraph.line_height
 
         self.draw_children(canvas, x, y, width, height)
 
     def get_bounding_rect(self) -> Rect:
-        font = skia.Font(None, self.__size)
-        width = font.measureText(self.__text, skia.TextEncoding.kUTF8)
-        metrics = font.getMetrics()
-        line_height = abs(metrics.fTop) + abs(metrics.fBottom)
-        return Rect(0, 0, width, line_height)
+        width, height = self.__get_paragraph().measure(self.__get_line_width())
+        return Rect(0, 0, width, height)
+
+    @property
+    def current_color(self) -> Color:
+        return self.__color
+
+    @property
+    def current_background(self) -> Optional[Color]:
+        return self.__background
 
     def color(self, color: Color) -> 'Text':
         self.__color = color
@@ -51,3 +88,10 @@ class Text(View):
     def background(self, color: Color) -> 'Text':
         self.__background = color
         return self
+
+    def wrap(self, wrap: bool = True) -> 'Text':
+        """
+        Breaks the text into lines fitting the width given by the parent.
+        """
+        self.__wrap = wrap
+        return self
@@ -5,6 +5,8 @@ from views.enums import Alignment, Justify
 
 
 class VBox(View):
+    __slots__ = ('_alignment', '_justify', '_spacing', '_wrap', '_view_height', '_view_width')
+
     def __init__(self):
         super().__init__()
         self._alignment = Alignment.BEGIN